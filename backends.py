@@ -0,0 +1,181 @@
+"""
+PDF text extraction backends.
+
+PyPDF2 is the default and the only required dependency. pypdfium2 (a binding
+to the PDFium C++ library) is much faster and is picked by 'auto' when it is
+installed; pdfminer.six is also supported. The backend can be chosen with
+--pdf-backend on the command line or the CV_PARSER_PDF_BACKEND environment
+variable.
+
+A backend only needs a `name` and an `iter_pages(source)` generator that
+yields the text of each page in order, where source is a file path or a
+MappedPdf buffer. Libraries are imported on first use, so listing or
+selecting a backend costs nothing.
+"""
+
+import contextlib
+import mmap
+import os
+
+DEFAULT_BACKEND = 'pypdf2'
+ENV_VARIABLE = 'CV_PARSER_PDF_BACKEND'
+PDF_MAGIC = b'%PDF-'
+# Readers accept the header anywhere in the first kilobyte
+MAGIC_WINDOW = 1024
+
+
+class RejectedFile(ValueError):
+    """A file refused before parsing: too large, or not a PDF."""
+
+
+class MappedPdf:
+    """
+    A PDF mapped into memory, checked before any parsing is done.
+
+    Opening fails fast with RejectedFile if the file is larger than max_bytes
+    or does not start with the PDF header, so a huge or mislabelled upload
+    costs one stat and one page read rather than a full parse. Used as a
+    context manager it yields the mmap, which can be hashed and handed to
+    a backend without copying the file into Python memory.
+    """
+
+    def __init__(self, pdf_path, max_bytes=None):
+        self.path = pdf_path
+        with open(pdf_path, 'rb') as file:
+            self.size = os.fstat(file.fileno()).st_size
+            if max_bytes is not None and self.size > max_bytes:
+                raise RejectedFile(f"file is {self.size} bytes, over the {max_bytes} byte limit")
+            if self.size == 0:
+                raise RejectedFile("not a PDF file (empty)")
+            # Copy-on-write so ctypes can wrap it; pages are never written
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+        if self.data.find(PDF_MAGIC, 0, MAGIC_WINDOW) == -1:
+            self.close()
+            raise RejectedFile("not a PDF file")
+        if hasattr(self.data, 'madvise'):
+            self.data.madvise(mmap.MADV_SEQUENTIAL)
+
+    def close(self):
+        try:
+            self.data.close()
+        except BufferError:
+            # A reader still holds a view; the mapping goes when it is collected
+            pass
+
+    def __enter__(self):
+        return self.data
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+@contextlib.contextmanager
+def _open_stream(source):
+    if isinstance(source, mmap.mmap):
+        source.seek(0)
+        yield source
+    else:
+        with open(source, 'rb') as file:
+            yield file
+
+
+class PyPDF2Backend:
+    name = 'pypdf2'
+    module = 'PyPDF2'
+
+    def iter_pages(self, source):
+        import PyPDF2
+        with _open_stream(source) as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            for page in pdf_reader.pages:
+                yield page.extract_text() or ''
+
+
+class PdfiumBackend:
+    name = 'pdfium'
+    module = 'pypdfium2'
+
+    def iter_pages(self, source):
+        import ctypes
+        import pypdfium2
+        if isinstance(source, mmap.mmap):
+            # PDFium reads straight from the mapping
+            source = (ctypes.c_char * len(source)).from_buffer(source)
+        pdf = pypdfium2.PdfDocument(source)
+        try:
+            for index in range(len(pdf)):
+                page = pdf[index]
+                textpage = page.get_textpage()
+                try:
+                    # PDFium ends lines with \r\n
+                    yield textpage.get_text_range().replace('\r\n', '\n')
+                finally:
+                    textpage.close()
+                    page.close()
+        finally:
+            pdf.close()
+
+
+class PdfminerBackend:
+    name = 'pdfminer'
+    module = 'pdfminer'
+
+    def iter_pages(self, source):
+        import io
+        from pdfminer.converter import TextConverter
+        from pdfminer.layout import LAParams
+        from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+        from pdfminer.pdfpage import PDFPage
+
+        # Plain top-to-bottom reading order; boxes_flow=None skips the costly
+        # text-box ordering pass and vertical text detection is not needed.
+        laparams = LAParams(boxes_flow=None, detect_vertical=False, all_texts=False)
+        resources = PDFResourceManager(caching=True)
+        with _open_stream(source) as file:
+            for page in PDFPage.get_pages(file):
+                output = io.StringIO()
+                device = TextConverter(resources, output, laparams=laparams)
+                try:
+                    PDFPageInterpreter(resources, device).process_page(page)
+                finally:
+                    device.close()
+                yield output.getvalue().replace('\x0c', '')
+
+
+BACKENDS = {backend.name: backend for backend in (PyPDF2Backend(), PdfiumBackend(), PdfminerBackend())}
+# Preference order for 'auto': fastest first
+AUTO_ORDER = ('pdfium', 'pypdf2', 'pdfminer')
+_auto_backend = None
+
+
+def is_available(name):
+    import importlib.util
+    return importlib.util.find_spec(BACKENDS[name].module) is not None
+
+
+def available_backends():
+    return [name for name in BACKENDS if is_available(name)]
+
+
+def get_backend(name=None):
+    """
+    Return the backend called name. None means the CV_PARSER_PDF_BACKEND
+    environment variable, or PyPDF2 if that is unset; 'auto' picks the
+    fastest installed backend.
+    """
+    if name is None:
+        name = os.environ.get(ENV_VARIABLE, DEFAULT_BACKEND)
+    name = name.lower()
+    if name == 'auto':
+        global _auto_backend
+        if _auto_backend is None:
+            for candidate in AUTO_ORDER:
+                if is_available(candidate):
+                    _auto_backend = BACKENDS[candidate]
+                    break
+            else:
+                raise ValueError("no PDF backend is installed (pip install PyPDF2)")
+        return _auto_backend
+    if name not in BACKENDS:
+        raise ValueError(f"unknown PDF backend {name!r}, choose from: auto, {', '.join(BACKENDS)}")
+    return BACKENDS[name]
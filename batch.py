@@ -0,0 +1,218 @@
+"""
+Field extraction over many texts at once.
+
+    columns = batch.extract_columns(texts)
+    columns['Email'][0], columns['Phone'][0], ...
+
+    python batch.py cv_cache.sqlite    # refresh every cached result
+
+extract_columns returns the same fields as engine.extract_information, but
+as one list per field. Texts can be a list, a pandas Series or an Arrow
+array. The email, phone and grade patterns are run over all the texts
+joined into a single buffer rather than text by text: one search call
+skips every document without a match, and each match is mapped back to its
+document by offset. The join uses NUL, which none of
+the patterns can match across, so no match ever spans two documents and
+results are identical to extracting each text on its own.
+
+refresh_cache() uses this to re-extract every text stored in a
+cache.ResultCache after the extraction rules change, without re-reading a
+single PDF, with batches spread over worker processes.
+"""
+
+import argparse
+import bisect
+import collections
+import itertools
+import sys
+import time
+
+import cache
+import engine
+import parallel
+
+FIELDS = ('Name', 'Email', 'Phone', 'University', 'Grade')
+SEPARATOR = '\x00'
+
+
+def _as_list(texts):
+    if hasattr(texts, 'to_pylist'):  # pyarrow Array / ChunkedArray
+        texts = texts.to_pylist()
+    elif hasattr(texts, 'tolist'):  # pandas Series, numpy array
+        texts = texts.tolist()
+    return ['' if text is None else text for text in texts]
+
+
+def _first_matches(pattern, texts, docs):
+    """
+    Yield (doc, match, offset, end) for the first match of pattern in each of
+    docs that has one. The match refers to the joined buffer (match.string),
+    in which that doc spans offset to end.
+    """
+    if not docs:
+        return
+    buffer = SEPARATOR.join(texts[doc] for doc in docs)
+    starts = [0]
+    starts.extend(itertools.accumulate(len(texts[doc]) + len(SEPARATOR) for doc in docs[:-1]))
+    last = len(docs) - 1
+    search = pattern.search
+    pos = 0
+    # One search call skips over every document without a match
+    while True:
+        match = search(buffer, pos)
+        if match is None:
+            return
+        position = bisect.bisect_right(starts, match.start()) - 1
+        if position == last:
+            yield docs[position], match, starts[position], len(buffer)
+            return
+        pos = starts[position + 1]
+        yield docs[position], match, starts[position], pos - len(SEPARATOR)
+
+
+def _first_per_doc(patterns, triggers, texts, docs, found):
+    # Each pattern in priority order over the docs no earlier pattern matched
+    # and whose triggers (see engine.PatternFamily) do not rule it out
+    digit_runs = {}
+    for index, pattern in enumerate(patterns):
+        remaining = [doc for doc in docs if doc not in found]
+        if triggers is not None:
+            remaining = [doc for doc in remaining if engine.may_match(triggers[index], texts[doc])]
+            digit_run = triggers[index][1]
+            if digit_run:
+                for doc in remaining:
+                    if doc not in digit_runs:
+                        digit_runs[doc] = engine.longest_digit_run(texts[doc])
+                remaining = [doc for doc in remaining if digit_runs[doc] >= digit_run]
+        for doc, match, offset, _ in _first_matches(pattern, texts, remaining):
+            found[doc] = (index, match, offset)
+
+
+def extract_columns(texts, gazetteer=None):
+    """
+    Extract the CV fields from every text, returning {field: [value, ...]}
+    with one value per text, in order. Empty or missing texts give empty fields.
+    """
+    texts = _as_list(texts)
+    count = len(texts)
+    columns = {field: [''] * count for field in FIELDS}
+    docs = [doc for doc in range(count) if texts[doc]]
+
+    with_at = [doc for doc in docs if engine.may_match(engine.EMAIL_TRIGGERS, texts[doc])]
+    for doc, match, _, _ in _first_matches(engine.EMAIL_RE, texts, with_at):
+        columns['Email'][doc] = match.group()
+
+    # Phone: the first pattern with a match decides, then every match of it
+    # in that document, longest wins
+    phones = {}
+    _first_per_doc(engine.PHONE_FAMILY.patterns, engine.PHONE_FAMILY.triggers, texts, docs, phones)
+    for doc, (index, match, offset) in phones.items():
+        end = offset + len(texts[doc])
+        phone_matches = engine.PHONE_FAMILY.patterns[index].findall(match.string, match.start(), end)
+        columns['Phone'][doc] = engine.clean_phone_number(max(phone_matches, key=len))
+
+    # Grade: scanned case-folded where that is exact, see engine.PatternFamily
+    lowered = [None] * count
+    for doc in docs:
+        lowered[doc] = texts[doc].lower()
+    unfoldable = {doc for doc in docs if engine._UNSAFE_FOLD_RE.search(texts[doc])}
+    foldable = [doc for doc in docs if doc not in unfoldable]
+    unfoldable = sorted(unfoldable)
+    grades = {}
+    _first_per_doc(engine.GRADE_FAMILY.folded, engine.GRADE_FAMILY.triggers, lowered, foldable, grades)
+    _first_per_doc(engine.GRADE_FAMILY.patterns, None, texts, unfoldable, grades)
+    for doc, (index, match, offset) in grades.items():
+        group = 1 if engine.GRADE_FAMILY.patterns[index].groups else 0
+        start, end = match.span(group)
+        value = '' if start == -1 else texts[doc][start - offset:end - offset]
+        columns['Grade'][doc] = engine.clean_grade(value)
+
+    # University and name work line by line within each document
+    for doc in docs:
+        lines = texts[doc].split('\n')
+        columns['University'][doc] = engine.find_university(lines, lowered[doc], gazetteer)
+        columns['Name'][doc] = engine.find_name(texts[doc], lines)
+    return columns
+
+
+def to_rows(columns):
+    """The columns as a list of extract_information-style dicts."""
+    return [dict(zip(FIELDS, values)) for values in zip(*(columns[field] for field in FIELDS))]
+
+
+def to_records(columns):
+    """The columns as compact engine.CVRecord objects (Filename left empty)."""
+    return [engine.CVRecord('', *values) for values in zip(*(columns[field] for field in FIELDS))]
+
+
+def to_pandas(columns):
+    import pandas
+    return pandas.DataFrame(columns, columns=list(FIELDS))
+
+
+def to_arrow(columns):
+    import pyarrow
+    return pyarrow.table({field: columns[field] for field in FIELDS})
+
+
+def _extract_batch(task):
+    batch, gazetteer = task
+    columns = extract_columns([text for _, text in batch], gazetteer)
+    return [content_hash for content_hash, _ in batch], to_rows(columns)
+
+
+def refresh_cache(result_cache, gazetteer=None, batch_size=1000, workers=None):
+    """
+    Re-extract fields for every text in result_cache and store the results
+    under the current rules, spreading batches over worker processes.
+    Returns the number of texts processed.
+    """
+    variant = f'gazetteer={gazetteer.fingerprint}' if gazetteer is not None else ''
+    tasks = ((batch, gazetteer) for batch in result_cache.iter_texts(batch_size))
+    total = 0
+    for hashes, rows in _extract_batches(tasks, workers or parallel.default_workers()):
+        result_cache.put_results(zip(hashes, rows), variant)
+        total += len(hashes)
+    return total
+
+
+def _extract_batches(tasks, workers):
+    if workers == 1:
+        yield from map(_extract_batch, tasks)
+        return
+    # Batches are read from the cache here in the main thread (SQLite
+    # connections cannot be shared), keeping a few per worker in flight.
+    import multiprocessing
+    with multiprocessing.Pool(workers) as pool:
+        pending = collections.deque()
+        for task in tasks:
+            pending.append(pool.apply_async(_extract_batch, (task,)))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='cv-parser-batch',
+        description="Re-extract the fields of every CV in a cache file under the current rules, "
+                    "without reading the PDFs again."
+    )
+    parser.add_argument('cache', help=f"cache file (e.g. {cache.DEFAULT_CACHE_FILE})")
+    parser.add_argument('--gazetteer', metavar='FILE', default=None,
+                        help="refresh the results for this gazetteer, as passed to cv_parser.py")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="number of worker processes (default: one per CPU core)")
+    parser.add_argument('--batch-size', type=int, default=1000, help="texts per batch (default: 1000)")
+    args = parser.parse_args(argv)
+    gazetteer = engine.Gazetteer.from_file(args.gazetteer) if args.gazetteer else None
+    started = time.perf_counter()
+    with cache.ResultCache(args.cache) as result_cache:
+        total = refresh_cache(result_cache, gazetteer, args.batch_size, args.workers)
+    print(f"Re-extracted {total} CV(s) in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
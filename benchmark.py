@@ -0,0 +1,653 @@
+"""
+Benchmarks for the CV Parser engine.
+
+    python benchmark.py run                        # synthetic corpus, full report
+    python benchmark.py run --corpus DIR --save-baseline baseline.json
+    python benchmark.py run --compare baseline.json
+    python benchmark.py run --backends all         # compare PDF backends
+    python benchmark.py corpus DIR --count 500     # just write the corpus
+    python benchmark.py extraction --pages 1 50    # compiled vs original fields
+    python benchmark.py startup                    # import time of each entry point
+
+`run` parses every PDF and .txt CV in the corpus (a fresh synthetic one if
+none is given) and reports files/sec, per-file latency percentiles and peak
+memory, split into the PDF text extraction and field extraction phases.
+`extraction` also checks that the compiled extraction engine returns exactly
+the same fields as the original pattern-by-pattern implementation, also on
+variants of each CV missing the tokens the pattern triggers look for, that
+batch.extract_columns agrees with it, and how many regex scans the triggers
+skip.
+`startup` runs each entry point in a fresh interpreter under
+`python -X importtime` and reports how long the imports take, which optional
+libraries (GUI toolkit, PDF libraries, Arrow) get loaded and the slowest
+modules, both for a bare import and for parsing one CV from the command line.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+import backends
+import batch
+import engine
+
+FIRST_NAMES = ['Adesola', 'Faith', 'John', 'Mary', 'Chinedu', 'Ngozi', 'Tunde', 'Amaka', 'Peter', 'Grace']
+LAST_NAMES = ['Daramola', 'Ekowo', 'Smith', 'Okafor', 'Adeyemi', 'Balogun', 'Eze', 'Obi', 'Johnson', 'Bello']
+UNIVERSITIES = ['University of Lagos', 'Nigerian Law School, Abuja Campus', 'Yaba College of Technology',
+                'Federal Polytechnic Nekede', 'Harvard University', 'Covenant University, Ota']
+GRADES = ['Second Class Upper Division', 'Second Class Lower', 'First Class Honours', 'GPA: 3.75',
+          '4.2/5.0', 'Distinction', '72%', 'B+ Grade', '']
+FILLER = [
+    'Managed a team of five engineers delivering payment integrations on schedule.',
+    'Presented quarterly results to senior stakeholders and drafted board papers.',
+    'Published work on data quality in public health records (2019), pp. 112-130.',
+    'Volunteered with community outreach programmes across three states.',
+    'Skills: Python, SQL, Excel, stakeholder management, technical writing.',
+    'Reference available on request. Languages: English, Yoruba, French.',
+]
+
+
+# Entry points timed by `startup`, and the optional libraries worth noticing
+# when one of them loads
+ENTRY_POINTS = ('main', 'cv_parser', 'service', 'batch', 'gui')
+HEAVY_MODULES = ('tkinter', 'PyPDF2', 'pypdfium2', 'pdfminer', 'pyarrow', 'pandas', 'sqlite3', 'multiprocessing')
+IMPORT_TIME_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$')
+
+LAYOUTS = ('classic', 'contact-first', 'sidebar')
+LINES_PER_PAGE = 45
+
+
+def make_cv_pages(pages=1, seed=0, layout='classic'):
+    """
+    A synthetic CV as a list of pages, each a list of lines: a realistic
+    first page plus `pages - 1` pages of filler.
+    """
+    rng = random.Random(seed)
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    name = f'{first} {last}'.upper() if rng.random() < 0.5 else f'{first} {last}'
+    contact = [
+        f'Email: {first.lower()}.{last.lower()}@example.com',
+        f'Phone: {rng.choice(["+234 803", "0803", "+1 (555)"])} {rng.randint(100, 999)} {rng.randint(1000, 9999)}',
+        'Address: 12 Marina Road, Lagos',
+    ]
+    education = [
+        'EDUCATION',
+        rng.choice(UNIVERSITIES),
+        f'B.Sc. Computer Science 20{rng.randint(10, 18)}-20{rng.randint(19, 23)}',
+        rng.choice(GRADES),
+    ]
+    if layout == 'contact-first':
+        header = contact + [name, ''] + education
+    else:
+        header = [name] + contact + [''] + education
+    first_page = header + ['', 'EXPERIENCE'] + [rng.choice(FILLER) for _ in range(30)]
+    result = [first_page]
+    for _ in range(pages - 1):
+        result.append([rng.choice(FILLER) for _ in range(LINES_PER_PAGE)])
+    return result
+
+
+def make_cv_text(pages=1, seed=0, layout='classic'):
+    return '\n'.join(line for page in make_cv_pages(pages, seed, layout) for line in page) + '\n'
+
+
+def _pdf_string(text):
+    return '(' + text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)') + ')'
+
+
+def write_pdf(path, pages, layout='classic', font_size=11):
+    """
+    Write a minimal text-only PDF with one line of text per line given.
+
+    The 'sidebar' layout places the contact block in a right-hand column on
+    the first page, which changes the order text extractors return it in.
+    """
+    leading = font_size + 3
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        None,  # page tree, filled in once the page objects are numbered
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    page_ids = []
+    for page_number, lines in enumerate(pages):
+        ops = []
+        if layout == 'sidebar' and page_number == 0:
+            blocks = [(330, lines[1:4]), (50, lines[:1] + lines[4:])]
+        else:
+            blocks = [(50, lines)]
+        for x, block in blocks:
+            ops.append(f'BT /F1 {font_size} Tf {leading} TL {x} 770 Td')
+            ops.extend(f'{_pdf_string(line)} Tj T*' for line in block)
+            ops.append('ET')
+        stream = '\n'.join(ops).encode('latin-1', 'replace')
+        objects.append(b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream')
+        objects.append(b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+                       b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % len(objects))
+        page_ids.append(len(objects))
+    objects[1] = (b'<< /Type /Pages /Kids [' + b' '.join(b'%d 0 R' % i for i in page_ids)
+                  + b'] /Count %d >>' % len(page_ids))
+
+    data = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(data))
+        data += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+    xref = len(data)
+    data += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    data += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    data += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    with open(path, 'wb') as file:
+        file.write(data)
+
+
+def generate_corpus(out_dir, count=200, seed=0, text_share=0.2, max_pages=40):
+    """
+    Write `count` synthetic CVs to out_dir and return their paths.
+
+    Most CVs are one to three pages; about one in ten is a long portfolio or
+    publication list of up to max_pages pages. text_share of them are plain
+    .txt files, the rest PDFs with a random layout and font size.
+    """
+    rng = random.Random(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for i in range(count):
+        pages = rng.randint(4, max_pages) if rng.random() < 0.1 else rng.randint(1, 3)
+        layout = rng.choice(LAYOUTS)
+        cv_pages = make_cv_pages(pages, seed * 100003 + i, layout)
+        if rng.random() < text_share:
+            path = os.path.join(out_dir, f'cv_{i:05d}.txt')
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write('\n'.join(line for page in cv_pages for line in page) + '\n')
+        else:
+            path = os.path.join(out_dir, f'cv_{i:05d}.pdf')
+            write_pdf(path, cv_pages, layout, font_size=rng.choice([10, 11, 12]))
+        paths.append(path)
+    return paths
+
+
+def legacy_extract_information(text):
+    """extract_information as it was before the patterns were precompiled."""
+    info = {
+        'Name': '',
+        'Email': '',
+        'Phone': '',
+        'University': '',
+        'Grade': ''
+    }
+
+    # Extract email
+    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+    email_match = re.search(email_pattern, text)
+    if email_match:
+        info['Email'] = email_match.group()
+
+    # Extract phone number
+    phone_patterns = [
+        r'\+?234\s*[0-9]{3}\s*[0-9]{3}\s*[0-9]{4}',  # +234 XXX XXX XXXX
+        r'\+?234\s*[0-9]{10}',  # +234XXXXXXXXXX
+        r'\+?234\s*\(?0\)?[0-9]{3}\s*[0-9]{3}\s*[0-9]{4}',  # +234(0)XXX XXX XXXX
+        r'0[7-9][0-1][0-9]{8}',  # 0XXXXXXXXXX
+        r'\+?[0-9]{1,4}[-.\s]?\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}',  # International with dashes/parentheses
+        r'\+?[0-9]{10,15}',  # Long international numbers
+    ]
+    for pattern in phone_patterns:
+        phone_matches = re.findall(pattern, text)
+        if phone_matches:
+            info['Phone'] = engine.clean_phone_number(max(phone_matches, key=len))
+            break
+
+    # Extract university
+    university_keywords = [
+        'university', 'college', 'institute', 'school', 'academy', 'polytechnic', 'law school'
+    ]
+    lines = text.split('\n')
+    university_candidates = []
+
+    for i, line in enumerate(lines):
+        line_lower = line.lower().strip()
+        for keyword in university_keywords:
+            if keyword in line_lower:
+                university_name = line.strip()
+                # Combine with previous/next lines if they seem part of the name
+                start_idx = max(0, i-1)
+                end_idx = min(len(lines), i+2)
+                for j in range(start_idx, end_idx):
+                    if j != i and lines[j].strip():
+                        if not any(word in lines[j].lower() for word in ['email', 'phone', 'address', 'cv', 'resume', 'curriculum', 'vitae', 'grade', 'gpa']):
+                            university_name += ' ' + lines[j].strip()
+                university_name = re.sub(r'\s+', ' ', university_name).strip()
+                if len(university_name) > 5 and len(university_name) < 200:
+                    university_candidates.append(university_name)
+
+    if university_candidates:
+        info['University'] = engine.clean_university_name(max(university_candidates, key=len))
+
+    # Extract grade
+    grade_patterns = [
+        r'Second\s*Class\s*Upper\s*(Division|Honours)?',
+        r'Second\s*Class\s*Lower\s*(Division|Honours)?',
+        r'First\s*Class\s*(Division|Honours)?',
+        r'Third\s*Class\s*(Division|Honours)?',
+        r'Pass\s*Class',
+        r'Distinction',
+        r'Merit',
+        r'Credit',
+        r'GPA[:\s]*([0-9]\.[0-9]{1,2})',
+        r'([0-9]\.[0-9]{1,2})/[0-9]\.[0-9]{1,2}',
+        r'([0-9]\.[0-9]{1,2})\s*GPA',
+        r'([0-9]{1,2})%',
+        r'([A-F][+-]?)\s*Grade',
+        r'([A-F][+-]?)\s*\([0-9]\.[0-9]{1,2}\)',
+    ]
+    for pattern in grade_patterns:
+        grade_matches = re.findall(pattern, text, re.IGNORECASE)
+        if grade_matches:
+            if isinstance(grade_matches[0], tuple):
+                info['Grade'] = engine.clean_grade(grade_matches[0][0])
+            else:
+                info['Grade'] = engine.clean_grade(grade_matches[0])
+            break
+
+    # Extract name
+    name_patterns = [
+        r'^([A-Z\s]+)$',  # All-caps names in first lines
+        r'Name[:\s]*([A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,3})',
+        r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,3})\s*(?:CV|Resume|Curriculum\s*Vitae)',
+        r'^([A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+){1,3})$',  # Mixed case names
+    ]
+    exclude_words = ['cv', 'resume', 'curriculum', 'vitae', 'email', 'phone', 'address',
+                     'university', 'college', 'institute', 'school', 'academy', 'polytechnic',
+                     'law', 'second', 'first', 'third', 'class', 'upper', 'lower', 'nigeria']
+
+    for i, line in enumerate(lines[:10]):
+        line = line.strip()
+        if len(line) > 0:
+            for pattern in name_patterns:
+                name_match = re.match(pattern, line)
+                if name_match:
+                    potential_name = name_match.group(1)
+                    if not any(word in potential_name.lower() for word in exclude_words):
+                        info['Name'] = engine.clean_name(potential_name)
+                        break
+            if info['Name']:
+                break
+
+    if not info['Name']:
+        for pattern in name_patterns[1:]:
+            name_match = re.search(pattern, text)
+            if name_match:
+                potential_name = name_match.group(1)
+                if not any(word in potential_name.lower() for word in exclude_words):
+                    info['Name'] = engine.clean_name(potential_name)
+                    break
+
+    return info
+
+
+def time_per_call(func, texts, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            func(text)
+        best = min(best, time.perf_counter() - start)
+    return best / len(texts)
+
+
+def sparse_variants(text, seed):
+    """
+    The text with random lines dropped, and with its digits, '@' or '%'
+    removed: CVs missing the tokens the pattern triggers look for.
+    """
+    rng = random.Random(seed)
+    lines = text.split('\n')
+    yield '\n'.join(line for line in lines if rng.random() < 0.5)
+    yield re.sub('[0-9]', '', text)
+    yield text.replace('@', ' ').replace('%', ' ')
+
+
+def regex_scans(texts):
+    """(scans run, scans without triggers): phone, grade and email regex passes over texts."""
+    run = unfiltered = 0
+    for text in texts:
+        run += engine.may_match(engine.EMAIL_TRIGGERS, text)
+        unfiltered += 1
+        for family, folded in ((engine.PHONE_FAMILY, None), (engine.GRADE_FAMILY, engine.fold_text(text))):
+            index, _ = family.search(text, folded)
+            # Without triggers every pattern up to the winner is scanned
+            last = len(family.patterns) - 1 if index is None else index
+            unfiltered += last + 1
+            run += sum(1 for candidate, _, _ in family.candidates(text, folded) if candidate <= last)
+    return run, unfiltered
+
+
+def bench_extraction(pages_list, cvs, repeat):
+    print(f"{'pages':>5} {'chars':>8} {'original ms':>12} {'compiled ms':>12} {'speedup':>8} {'batch ms':>9} "
+          f"{'scans skipped':>14}")
+    for pages in pages_list:
+        texts = [make_cv_text(pages, seed) for seed in range(cvs)]
+        checked = texts + [variant for seed, text in enumerate(texts) for variant in sparse_variants(text, seed)]
+        for text in checked:
+            if legacy_extract_information(text) != engine.extract_information(text):
+                raise AssertionError(f"compiled extraction differs from the original for:\n{text[:500]}")
+        if batch.to_rows(batch.extract_columns(checked)) != [engine.extract_information(text) for text in checked]:
+            raise AssertionError(f"batch extraction differs from extract_information for {pages}-page CVs")
+        chars = sum(len(text) for text in texts) // len(texts)
+        legacy_time = time_per_call(legacy_extract_information, texts, repeat)
+        compiled_time = time_per_call(engine.extract_information, texts, repeat)
+        # One call over all the texts, per text
+        batch_time = time_per_call(batch.extract_columns, [texts], repeat) / len(texts)
+        scans, unfiltered = regex_scans(texts)
+        print(f"{pages:>5} {chars:>8} {legacy_time * 1000:>12.3f} {compiled_time * 1000:>12.3f} "
+              f"{legacy_time / compiled_time:>7.1f}x {batch_time * 1000:>9.3f} "
+              f"{(unfiltered - scans) / unfiltered:>13.0%}")
+
+
+def percentile(sorted_values, fraction):
+    # Nearest-rank percentile of an already sorted list
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def latency_summary(seconds):
+    values = sorted(seconds)
+    return {
+        'count': len(values),
+        'total_s': sum(values),
+        'p50_ms': percentile(values, 0.50) * 1000,
+        'p95_ms': percentile(values, 0.95) * 1000,
+        'p99_ms': percentile(values, 0.99) * 1000,
+    }
+
+
+def peak_rss_kb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def corpus_files(corpus_dir):
+    return sorted(
+        os.path.join(corpus_dir, name) for name in os.listdir(corpus_dir)
+        if name.lower().endswith(('.pdf', '.txt'))
+    )
+
+
+def run_suite(paths, repeat=3, backend=None):
+    """
+    Parse every file in-process, timing the PDF and field extraction phases
+    separately. Each file is parsed `repeat` times and its fastest run kept,
+    which filters out most scheduling noise.
+    """
+    pdf_backend = backends.get_backend(backend)
+    pdf_times, field_times, file_times = [], [], []
+    for path in paths:
+        best_pdf = best_fields = float('inf')
+        is_pdf = path.lower().endswith('.pdf')
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            if is_pdf:
+                text = engine.extract_text_from_pdf(path, backend=pdf_backend)
+            else:
+                with open(path, encoding='utf-8') as file:
+                    text = file.read()
+            t1 = time.perf_counter()
+            engine.extract_information(text)
+            t2 = time.perf_counter()
+            best_pdf = min(best_pdf, t1 - t0)
+            best_fields = min(best_fields, t2 - t1)
+        if is_pdf:
+            pdf_times.append(best_pdf)
+        field_times.append(best_fields)
+        file_times.append((best_pdf if is_pdf else 0.0) + best_fields)
+    elapsed = sum(file_times)
+    return {
+        'files': len(paths),
+        'elapsed_s': elapsed,
+        'files_per_sec': len(paths) / elapsed if elapsed else 0.0,
+        'latency': latency_summary(file_times),
+        'phases': {
+            'pdf_text': latency_summary(pdf_times),
+            'fields': latency_summary(field_times),
+        },
+        'peak_rss_kb': peak_rss_kb(),
+        'pdf_backend': pdf_backend.name,
+        'engine_version': engine.EXTRACTOR_VERSION,
+        'python': platform.python_version(),
+    }
+
+
+def bench_backends(paths, names, repeat=3):
+    """PDF text extraction throughput of each backend over the PDFs in paths."""
+    pdf_paths = [path for path in paths if path.lower().endswith('.pdf')]
+    results = {}
+    for name in names:
+        backend = backends.get_backend(name)
+        times = []
+        for path in pdf_paths:
+            best = float('inf')
+            for _ in range(repeat):
+                start = time.perf_counter()
+                engine.extract_text_from_pdf(path, backend=backend)
+                best = min(best, time.perf_counter() - start)
+            times.append(best)
+        stats = latency_summary(times)
+        stats['files_per_sec'] = len(times) / stats['total_s'] if stats['total_s'] else 0.0
+        results[backend.name] = stats
+    return results
+
+
+def print_backends(results):
+    print(f"{'backend':<14}{'files':>7} {'files/sec':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, stats in results.items():
+        print(f"{name:<14}{stats['count']:>7} {stats['files_per_sec']:>10.1f} {stats['p50_ms']:>9.2f} "
+              f"{stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f}")
+
+
+def print_report(results):
+    print(f"files:        {results['files']} (PDF backend: {results['pdf_backend']})")
+    print(f"throughput:   {results['files_per_sec']:.1f} files/sec ({results['elapsed_s']:.2f}s of parsing)")
+    print(f"{'':14}{'files':>7} {'total s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    rows = [('per file', results['latency'])] + [(name, stats) for name, stats in results['phases'].items()]
+    for name, stats in rows:
+        print(f"{name:<14}{stats['count']:>7} {stats['total_s']:>9.2f} {stats['p50_ms']:>9.2f} "
+              f"{stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f}")
+    if results['peak_rss_kb'] is not None:
+        print(f"peak RSS:     {results['peak_rss_kb'] / 1024:.1f} MB")
+    if results.get('backends'):
+        print()
+        print_backends(results['backends'])
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """Return a list of human-readable regressions beyond `tolerance` (a fraction)."""
+    regressions = []
+
+    def check(label, current, previous, higher_is_better=False):
+        if not previous:
+            return
+        change = (current - previous) / previous
+        worse = -change if higher_is_better else change
+        if worse > tolerance:
+            regressions.append(f"{label}: {previous:.2f} -> {current:.2f} ({change:+.0%})")
+
+    check('files/sec', results['files_per_sec'], baseline['files_per_sec'], higher_is_better=True)
+    for stat in ('p50_ms', 'p95_ms', 'p99_ms'):
+        check(f'per file {stat}', results['latency'][stat], baseline['latency'][stat])
+        for phase, stats in results['phases'].items():
+            previous = baseline['phases'].get(phase)
+            if previous:
+                check(f'{phase} {stat}', stats[stat], previous[stat])
+    if results['peak_rss_kb'] and baseline.get('peak_rss_kb'):
+        check('peak RSS KB', results['peak_rss_kb'], baseline['peak_rss_kb'])
+    for name, stats in results.get('backends', {}).items():
+        previous = baseline.get('backends', {}).get(name)
+        if previous:
+            check(f'{name} backend files/sec', stats['files_per_sec'], previous['files_per_sec'],
+                  higher_is_better=True)
+    return regressions
+
+
+def import_profile(command, repeat=3):
+    """
+    Run a Python command line (without the interpreter) under -X importtime,
+    keeping the fastest of `repeat` runs. Returns wall time, total import
+    time and {module: (self_us, cumulative_us)} for that run.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = subprocess.run([sys.executable, '-X', 'importtime'] + command, cwd=here,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        wall = time.perf_counter() - started
+        if result.returncode != 0:
+            raise RuntimeError(f"{' '.join(command)} failed: {result.stderr.strip()[-500:]}")
+        modules = {}
+        total = 0
+        for line in result.stderr.splitlines():
+            match = IMPORT_TIME_RE.match(line)
+            if match:
+                self_us, cumulative_us, indent, name = match.groups()
+                modules[name] = (int(self_us), int(cumulative_us))
+                if not indent:
+                    total += int(cumulative_us)
+        if best is None or wall < best['wall_ms'] / 1000:
+            best = {'wall_ms': round(wall * 1000, 1), 'import_ms': round(total / 1000, 1), 'modules': modules}
+    return best
+
+
+def print_startup(name, profile, top):
+    loaded = [module for module in HEAVY_MODULES if module in profile['modules']]
+    print(f"{name:<24}{profile['wall_ms']:>9.1f} {profile['import_ms']:>10.1f}   {', '.join(loaded) or '-'}")
+    slowest = sorted(profile['modules'].items(), key=lambda item: -item[1][0])[:top]
+    if slowest:
+        print(' ' * 4 + ', '.join(f"{module} {self_us / 1000:.1f}" for module, (self_us, _) in slowest))
+
+
+def command_startup(args):
+    print(f"{'entry point':<24}{'wall ms':>9} {'import ms':>10}   optional modules loaded")
+    print(f"{'':4}(slowest modules, ms of their own import time)")
+    for name in args.entry_points:
+        print_startup(f'import {name}', import_profile(['-c', f'import {name}'], args.repeat), args.top)
+    with tempfile.TemporaryDirectory(prefix='cv_bench_') as corpus_dir:
+        path = os.path.join(corpus_dir, 'cv.pdf')
+        write_pdf(path, make_cv_pages(1))
+        profile = import_profile(['main.py', path, '-o', '-', '-q', '-j', '1'], args.repeat)
+    print_startup('main.py CV.pdf', profile, args.top)
+    return 0
+
+
+def command_run(args):
+    backend_names = []
+    if args.backends:
+        backend_names = backends.available_backends() if args.backends == ['all'] else args.backends
+        missing = [name for name in backend_names if not backends.is_available(name)]
+        if missing:
+            print(f"benchmark: PDF backend(s) not installed: {', '.join(missing)}", file=sys.stderr)
+            return 1
+
+    def measure(paths):
+        results = run_suite(paths, args.repeat, args.pdf_backend)
+        if backend_names:
+            results['backends'] = bench_backends(paths, backend_names, args.repeat)
+        return results
+
+    if args.corpus:
+        paths = corpus_files(args.corpus)
+        if not paths:
+            print("benchmark: no .pdf or .txt files in the corpus", file=sys.stderr)
+            return 1
+        results = measure(paths)
+    else:
+        with tempfile.TemporaryDirectory(prefix='cv_bench_') as corpus_dir:
+            print(f"Generating {args.count} synthetic CVs")
+            paths = generate_corpus(corpus_dir, args.count, args.seed)
+            results = measure(paths)
+    print_report(results)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            baseline = json.load(file)
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print(f"REGRESSIONS against {args.compare} (tolerance {args.tolerance:.0%}):")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print(f"No regressions against {args.compare} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+def command_corpus(args):
+    paths = generate_corpus(args.out_dir, args.count, args.seed)
+    print(f"Wrote {len(paths)} CVs to {args.out_dir}")
+    return 0
+
+
+def command_extraction(args):
+    bench_extraction(args.pages, args.cvs, args.repeat)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the CV Parser extraction engine.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help="time parsing of a corpus of CVs")
+    run.add_argument('--corpus', metavar='DIR', help="folder of .pdf/.txt CVs (default: generate one)")
+    run.add_argument('--count', type=int, default=200, help="size of the generated corpus")
+    run.add_argument('--seed', type=int, default=0, help="seed for the generated corpus")
+    run.add_argument('--repeat', type=int, default=3, help="parse each file this many times, keep the fastest")
+    run.add_argument('--pdf-backend', default=None, help="PDF backend for the main run (default: as cv_parser.py)")
+    run.add_argument('--backends', nargs='+', metavar='NAME',
+                     help="also compare PDF text extraction across these backends ('all' for every installed one)")
+    run.add_argument('--save-baseline', metavar='FILE', help="save the results as a JSON baseline")
+    run.add_argument('--compare', metavar='FILE', help="flag regressions against a saved baseline")
+    run.add_argument('--tolerance', type=float, default=0.25,
+                     help="allowed slowdown before flagging a regression (default: 0.25 = 25%%)")
+    run.set_defaults(func=command_run)
+
+    corpus = commands.add_parser('corpus', help="write a synthetic corpus of CVs")
+    corpus.add_argument('out_dir')
+    corpus.add_argument('--count', type=int, default=200)
+    corpus.add_argument('--seed', type=int, default=0)
+    corpus.set_defaults(func=command_corpus)
+
+    extraction = commands.add_parser('extraction', help="compare compiled and original field extraction")
+    extraction.add_argument('--pages', type=int, nargs='+', default=[1, 5, 20, 50],
+                            help="synthetic CV lengths in pages")
+    extraction.add_argument('--cvs', type=int, default=20, help="CVs per length")
+    extraction.add_argument('--repeat', type=int, default=3, help="take the best of this many runs")
+    extraction.set_defaults(func=command_extraction)
+
+    startup = commands.add_parser('startup', help="time the imports of each entry point")
+    startup.add_argument('entry_points', nargs='*', default=list(ENTRY_POINTS), metavar='MODULE',
+                         help="modules to import (default: %(default)s)")
+    startup.add_argument('--repeat', type=int, default=5, help="take the fastest of this many runs")
+    startup.add_argument('--top', type=int, default=5, help="list this many of the slowest modules")
+    startup.set_defaults(func=command_startup)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+"""
+Persistent on-disk cache of parsed CVs.
+
+Entries are keyed by the SHA-256 of the PDF contents, so a re-uploaded file
+is recognised whatever it is called. Extracted text is stored once per file;
+extraction results are stored per engine.EXTRACTOR_VERSION and dropped
+automatically when the patterns change, in which case only the (cheap) field
+extraction is repeated. OCR text (see ocr.py) is stored per page, keyed by
+the hash of the rendered page image. The cache is bounded by the total size
+of stored text, evicting least recently used entries first.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+
+import engine
+
+DEFAULT_CACHE_FILE = 'cv_cache.sqlite'
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# Evicting needs a scan of the table, so only check every this many inserts.
+EVICT_EVERY = 100
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS texts (
+    content_hash TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS texts_last_access ON texts (last_access);
+CREATE TABLE IF NOT EXISTS results (
+    content_hash TEXT NOT NULL,
+    version TEXT NOT NULL,
+    info TEXT NOT NULL,
+    PRIMARY KEY (content_hash, version)
+);
+CREATE TABLE IF NOT EXISTS ocr_pages (
+    page_hash TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+"""
+
+
+def file_hash(path, chunk_size=1024 * 1024):
+    """SHA-256 of a file, given its path or its contents as a buffer (e.g. an mmap)."""
+    if not isinstance(path, (str, os.PathLike)):
+        return hashlib.sha256(path).hexdigest()
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    def __init__(self, path=DEFAULT_CACHE_FILE, max_bytes=DEFAULT_MAX_BYTES, version=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.version = version or engine.EXTRACTOR_VERSION
+        self._inserts = 0
+        import sqlite3  # only loaded by runs that use a cache
+        # Several worker processes may share one cache file
+        self.conn = sqlite3.connect(path, timeout=60)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(_SCHEMA)
+        with self.conn:
+            self.conn.execute(
+                'DELETE FROM results WHERE version != ? AND version NOT LIKE ?', (self.version, self.version + ':%')
+            )
+
+    file_hash = staticmethod(file_hash)
+
+    def get_text(self, content_hash):
+        row = self.conn.execute(
+            'SELECT text FROM texts WHERE content_hash = ?', (content_hash,)
+        ).fetchone()
+        if row is None:
+            return None
+        with self.conn:
+            self.conn.execute(
+                'UPDATE texts SET last_access = ? WHERE content_hash = ?', (time.time(), content_hash)
+            )
+        return row[0]
+
+    def put_text(self, content_hash, text):
+        with self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO texts (content_hash, text, size, last_access) VALUES (?, ?, ?, ?)',
+                (content_hash, text, len(text.encode('utf-8')), time.time())
+            )
+        self._inserted()
+
+    def get_result(self, content_hash, variant=''):
+        """variant distinguishes results for the same text under different options."""
+        row = self.conn.execute(
+            'SELECT info FROM results WHERE content_hash = ? AND version = ?',
+            (content_hash, self._result_version(variant))
+        ).fetchone()
+        if row is None:
+            return None
+        with self.conn:
+            self.conn.execute(
+                'UPDATE texts SET last_access = ? WHERE content_hash = ?', (time.time(), content_hash)
+            )
+        return json.loads(row[0])
+
+    def put_result(self, content_hash, info, variant=''):
+        with self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO results (content_hash, version, info) VALUES (?, ?, ?)',
+                (content_hash, self._result_version(variant), json.dumps(info))
+            )
+
+    def put_results(self, items, variant=''):
+        """Store many (content_hash, info) pairs in one transaction."""
+        version = self._result_version(variant)
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO results (content_hash, version, info) VALUES (?, ?, ?)',
+                ((content_hash, version, json.dumps(info)) for content_hash, info in items)
+            )
+
+    def get_page_text(self, page_hash):
+        row = self.conn.execute(
+            'SELECT text FROM ocr_pages WHERE page_hash = ?', (page_hash,)
+        ).fetchone()
+        if row is None:
+            return None
+        with self.conn:
+            self.conn.execute(
+                'UPDATE ocr_pages SET last_access = ? WHERE page_hash = ?', (time.time(), page_hash)
+            )
+        return row[0]
+
+    def put_page_text(self, page_hash, text):
+        with self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO ocr_pages (page_hash, text, size, last_access) VALUES (?, ?, ?, ?)',
+                (page_hash, text, len(text.encode('utf-8')), time.time())
+            )
+        self._inserted()
+
+    def iter_texts(self, batch_size=1000):
+        """Yield every stored text as lists of up to batch_size (content_hash, text) pairs."""
+        last = ''
+        while True:
+            rows = self.conn.execute(
+                'SELECT content_hash, text FROM texts WHERE content_hash > ? ORDER BY content_hash LIMIT ?',
+                (last, batch_size)
+            ).fetchall()
+            if not rows:
+                return
+            yield rows
+            last = rows[-1][0]
+
+    def _inserted(self):
+        self._inserts += 1
+        if self._inserts % EVICT_EVERY == 0:
+            self._evict_quietly()
+
+    def _evict_quietly(self):
+        # Keeping the cache small must never fail the file being parsed
+        import sqlite3
+        try:
+            self.evict()
+        except sqlite3.Error as e:
+            print(f"Could not evict old entries from the cache {self.path}: {e}", file=sys.stderr)
+
+    def _result_version(self, variant):
+        return f'{self.version}:{variant}' if variant else self.version
+
+    def evict(self):
+        """Drop least recently used files and pages until the stored text fits in max_bytes."""
+        total = self.conn.execute(
+            'SELECT (SELECT COALESCE(SUM(size), 0) FROM texts) + (SELECT COALESCE(SUM(size), 0) FROM ocr_pages)'
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        to_delete = []
+        pages_to_delete = []
+        entries = self.conn.execute(
+            'SELECT content_hash, size, last_access, 0 FROM texts '
+            'UNION ALL SELECT page_hash, size, last_access, 1 FROM ocr_pages '
+            'ORDER BY last_access'
+        )
+        for key, size, _, is_page in entries:
+            if total <= self.max_bytes:
+                break
+            (pages_to_delete if is_page else to_delete).append((key,))
+            total -= size
+        with self.conn:
+            self.conn.executemany('DELETE FROM texts WHERE content_hash = ?', to_delete)
+            self.conn.executemany('DELETE FROM results WHERE content_hash = ?', to_delete)
+            self.conn.executemany('DELETE FROM ocr_pages WHERE page_hash = ?', pages_to_delete)
+
+    def clear(self):
+        with self.conn:
+            self.conn.execute('DELETE FROM texts')
+            self.conn.execute('DELETE FROM results')
+            self.conn.execute('DELETE FROM ocr_pages')
+
+    def close(self):
+        try:
+            self._evict_quietly()
+        finally:
+            self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def trim_cache(path, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Evict from the cache file at path until it fits in max_bytes. The caches
+    open_cache opens in pool workers are never closed (and workers only
+    evict every EVICT_EVERY inserts), so whoever ran the workers calls this
+    once they are done.
+    """
+    import sqlite3
+    try:
+        # Closing evicts
+        ResultCache(path, max_bytes).close()
+    except sqlite3.Error as e:
+        print(f"Could not evict old entries from the cache {path}: {e}", file=sys.stderr)
+
+
+_open_caches = {}
+
+
+def open_cache(path, max_bytes=DEFAULT_MAX_BYTES):
+    """One shared ResultCache per file and process, for use inside pool workers."""
+    cache = _open_caches.get(path)
+    if cache is None:
+        cache = _open_caches[path] = ResultCache(path, max_bytes)
+    return cache
@@ -0,0 +1,261 @@
+"""
+Headless command-line entry point for the CV Parser.
+
+Usage:
+    python cv_parser.py CVS_DIR other/*.pdf -o results.csv
+    python cv_parser.py CVS_DIR --format jsonl -o results.jsonl
+
+Results are written as each CV is parsed; --resume continues an interrupted
+run and --incremental only parses what changed since the last run. Nothing
+here imports tkinter.
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+import backends
+import cache
+import dedupe
+import engine
+import jobs
+import manifest
+import metrics
+import ocr
+import writers
+
+
+def iter_input_files(inputs, recursive=False):
+    """Expand directories and glob patterns into a de-duplicated list of PDF paths."""
+    seen = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            pattern = os.path.join(item, '**', '*.pdf') if recursive else os.path.join(item, '*.pdf')
+            matches = sorted(glob.glob(pattern, recursive=recursive))
+        elif glob.has_magic(item):
+            matches = sorted(glob.glob(item, recursive=recursive))
+        else:
+            matches = [item]
+        for path in matches:
+            if os.path.isfile(path) and path not in seen:
+                seen.add(path)
+                yield path
+
+
+def megabytes(size):
+    return None if size is None else int(size * 1024 * 1024)
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(
+        prog='cv-parser',
+        description="Extract Name, Email, Phone, University and Grade from PDF CVs."
+    )
+    parser.add_argument('inputs', nargs='+', help="PDF files, directories or glob patterns")
+    parser.add_argument('-o', '--output', default='-', help="output file (default: stdout)")
+    parser.add_argument('-f', '--format', choices=writers.FORMATS, default=None,
+                        help="output format (default: from the output extension, else csv)")
+    parser.add_argument('--resume', action='store_true',
+                        help="append to an existing output file, skipping CVs already in it")
+    parser.add_argument('--flush-every', type=int, default=20, metavar='N',
+                        help="flush the output file after every N rows (default: 20)")
+    parser.add_argument('--compression', default=None,
+                        help="compression for parquet (snappy, gzip, brotli, lz4, zstd, none; default: snappy) "
+                             "or arrow output (lz4, zstd; default: none)")
+    parser.add_argument('--row-group-size', type=int, default=None, metavar='N',
+                        help=f"rows per row group in parquet/arrow output (default: {writers.DEFAULT_ROW_GROUP_SIZE})")
+    parser.add_argument('-r', '--recursive', action='store_true', help="search directories recursively")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="number of worker processes (default: one per CPU core)")
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help="files handed to a worker at a time (default: automatic)")
+    parser.add_argument('--timeout', type=float, default=None,
+                        help="give up on a single file after this many seconds")
+    parser.add_argument('--unordered', action='store_true',
+                        help="write results as soon as they finish instead of in input order")
+    parser.add_argument('--pdf-backend', default=None, choices=['auto'] + list(backends.BACKENDS),
+                        help=f"PDF text extractor (default: ${backends.ENV_VARIABLE} or {backends.DEFAULT_BACKEND}; "
+                             "'auto' picks the fastest installed)")
+    parser.add_argument('--max-pages', type=int, default=None, metavar='N',
+                        help="only read the first N pages of each CV")
+    parser.add_argument('--early-exit', action='store_true',
+                        help="stop reading a CV as soon as all five fields have been found")
+    parser.add_argument('--max-file-size', metavar='MB', type=float, default=None,
+                        help="skip files larger than this without parsing them")
+    parser.add_argument('--ocr', action='store_true',
+                        help="read scanned CVs without a text layer with Tesseract OCR (needs tesseract and pypdfium2)")
+    parser.add_argument('--ocr-workers', type=int, default=None, metavar='N',
+                        help="processes for OCR, separate from --workers (default: a quarter of the CPU cores)")
+    parser.add_argument('--ocr-lang', default=ocr.DEFAULT_LANGUAGES, metavar='LANGS',
+                        help=f"Tesseract languages, e.g. eng+deu (default: {ocr.DEFAULT_LANGUAGES})")
+    parser.add_argument('--ocr-dpi', type=int, default=ocr.DEFAULT_DPI,
+                        help=f"resolution pages are rendered at for OCR (default: {ocr.DEFAULT_DPI})")
+    parser.add_argument('--ocr-timeout', type=float, default=None, metavar='SECONDS',
+                        help="give up on OCR of a single page after this many seconds")
+    parser.add_argument('--dedupe', action='store_true',
+                        help="add a candidate_id column shared by CVs that look like the same person "
+                             "(same email or phone, or nearly the same text)")
+    parser.add_argument('--gazetteer', metavar='FILE', default=None,
+                        help="text file of known institution names, one per line, matched before the keyword search")
+    parser.add_argument('--cache', metavar='FILE', default=None,
+                        help=f"reuse results for files seen before, stored in FILE (e.g. {cache.DEFAULT_CACHE_FILE})")
+    parser.add_argument('--cache-size', metavar='MB', type=int, default=cache.DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help="maximum size of the cached text before old entries are evicted")
+    parser.add_argument('--incremental', action='store_true',
+                        help="only parse files that are new or changed since the last run, drop rows for "
+                             "files that are gone, and rewrite the output with the merged results")
+    parser.add_argument('--manifest', metavar='FILE', default=None,
+                        help="where --incremental keeps track of the inputs (default: OUTPUT.manifest.json)")
+    parser.add_argument('--metrics', metavar='FILE', default=None,
+                        help="record per-file timings, page counts, matched patterns and failures "
+                             "as JSON lines in FILE and print a summary at the end")
+    parser.add_argument('-q', '--quiet', action='store_true', help="do not report progress on stderr")
+    return parser
+
+
+def progress_printer():
+    printed = None
+
+    def print_progress(progress):
+        nonlocal printed
+        # The final report repeats the last update when that came in time
+        if progress.current and progress.state in (jobs.RUNNING, jobs.FINISHED) and progress.done != printed:
+            printed = progress.done
+            print(f"Processed {progress.describe()}: {os.path.basename(progress.current)}", file=sys.stderr)
+    return print_progress
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    if (args.resume or args.incremental) and args.output == '-':
+        print("cv-parser: --resume and --incremental need an output file (-o)", file=sys.stderr)
+        return 2
+    if args.resume and args.incremental:
+        print("cv-parser: use either --resume or --incremental, not both", file=sys.stderr)
+        return 2
+
+    paths = list(iter_input_files(args.inputs, recursive=args.recursive))
+    if not paths:
+        print("cv-parser: no PDF files found", file=sys.stderr)
+        return 1
+
+    try:
+        pdf_backend = backends.get_backend(args.pdf_backend)
+    except ValueError as e:
+        print(f"cv-parser: {e}", file=sys.stderr)
+        return 2
+    if not backends.is_available(pdf_backend.name):
+        print(f"cv-parser: the {pdf_backend.name} PDF backend needs the {pdf_backend.module} package",
+              file=sys.stderr)
+        return 2
+    gazetteer = engine.Gazetteer.from_file(args.gazetteer) if args.gazetteer else None
+    ocr_options = None
+    if args.ocr:
+        if not ocr.is_available():
+            print("cv-parser: --ocr needs the tesseract program and the pypdfium2 package", file=sys.stderr)
+            return 2
+        ocr_options = {'languages': args.ocr_lang, 'dpi': args.ocr_dpi, 'page_timeout': args.ocr_timeout}
+
+    max_file_size = megabytes(args.max_file_size)
+    inputs = None
+    output_path = args.output
+    if args.incremental:
+        inputs = manifest.Manifest(
+            args.manifest or manifest.default_manifest_path(args.output),
+            manifest.options_key(pdf_backend.name, args.max_pages, args.early_exit, gazetteer, max_file_size,
+                                 ocr_options, args.dedupe)
+        )
+        unchanged, paths, removed = inputs.plan(paths)
+        if not args.quiet:
+            if inputs.stale:
+                print("Extraction settings changed since the last run, parsing everything again", file=sys.stderr)
+            print(f"{len(unchanged)} unchanged, {len(paths)} new or changed, {len(removed)} removed",
+                  file=sys.stderr)
+        # The merged results replace the output only once the run completes
+        output_path = args.output + '.tmp'
+
+    output_format = args.format or writers.format_for_path(args.output)
+    try:
+        writer = writers.open_writer(output_path, output_format, resume=args.resume, flush_every=args.flush_every,
+                                     fieldnames=dedupe.FIELDNAMES if args.dedupe else engine.FIELDNAMES,
+                                     row_group_size=args.row_group_size, compression=args.compression)
+    except ImportError:
+        print(f"cv-parser: {output_format} output needs the pyarrow package", file=sys.stderr)
+        return 2
+    except ValueError as e:
+        print(f"cv-parser: {e}", file=sys.stderr)
+        return 2
+
+    summary = metrics.MetricsSummary(args.metrics) if args.metrics else None
+    duplicates = dedupe.DuplicateIndex() if args.dedupe else None
+    parsed = kept = 0
+    with writer:
+        if writer.done:
+            remaining = [pdf_path for pdf_path in paths if os.path.basename(pdf_path) not in writer.done]
+            if not args.quiet:
+                print(f"Skipping {len(paths) - len(remaining)} CV(s) already in {args.output}", file=sys.stderr)
+            paths = remaining
+            if duplicates is not None:
+                # CVs of the same people as the rows already written join their groups
+                for row in writer.previous_rows():
+                    duplicates.add_written(row)
+        if inputs is not None:
+            for pdf_path in unchanged:
+                row = inputs.row(pdf_path)
+                if row:
+                    if duplicates is not None:
+                        # Kept rows are indexed first, so new versions join their groups
+                        row[dedupe.CANDIDATE_FIELD] = duplicates.add(row)
+                    writer.write(row)
+                    kept += 1
+        job = jobs.ParseJob(paths, workers=args.workers, chunksize=args.chunksize,
+                            timeout=args.timeout, ordered=not args.unordered,
+                            cache_path=args.cache, cache_max_bytes=args.cache_size * 1024 * 1024,
+                            collect_metrics=summary is not None, keep_results=False,
+                            ocr_options=ocr_options, ocr_workers=args.ocr_workers, duplicates=duplicates,
+                            on_progress=None if args.quiet else progress_printer(), max_updates_per_second=2,
+                            max_pages=args.max_pages, early_exit=args.early_exit, gazetteer=gazetteer,
+                            backend=pdf_backend.name, max_file_size=max_file_size, file_hash=inputs is not None)
+        try:
+            for pdf_path, info, error, file_metrics in job:
+                if error:
+                    print(f"Error parsing {pdf_path}: {error}", file=sys.stderr)
+                if inputs is not None:
+                    # Files that failed are tried again next run
+                    if error:
+                        inputs.forget(pdf_path)
+                    else:
+                        inputs.record(pdf_path, info)
+                if info:
+                    if file_metrics is None:
+                        writer.write(info)
+                    else:
+                        started = time.perf_counter()
+                        writer.write(info)
+                        file_metrics.add_stage('write', time.perf_counter() - started)
+                    parsed += 1
+                if file_metrics is not None:
+                    summary.add(file_metrics)
+        except KeyboardInterrupt:
+            # The rows written so far are kept; --resume or --incremental picks up from there
+            print(f"Cancelled after {job.done} of {len(paths)} CV(s)", file=sys.stderr)
+    if inputs is not None:
+        os.replace(output_path, args.output)
+        inputs.save()
+    if summary is not None:
+        summary.close()
+        print(summary.report(), file=sys.stderr)
+    if not args.quiet:
+        if inputs is not None:
+            print(f"Successfully processed {parsed} CV(s), kept {kept} unchanged", file=sys.stderr)
+        else:
+            print(f"Successfully processed {parsed} CV(s)", file=sys.stderr)
+        if duplicates is not None:
+            print(f"{len(duplicates)} CV(s) from {duplicates.candidates} candidate(s)", file=sys.stderr)
+    return 130 if job.cancelled else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
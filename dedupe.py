@@ -0,0 +1,192 @@
+"""
+Duplicate-candidate detection.
+
+The same person often sends several versions of their CV. DuplicateIndex
+gives every row a candidate_id shared by all the CVs that look like the same
+person, as rows arrive:
+
+    index = dedupe.DuplicateIndex()
+    row['candidate_id'] = index.add(row)
+
+Two CVs belong together when they share an email address or phone number
+(looked up in a dictionary), or when their texts are nearly the same and
+their contact details do not contradict it: CVs written from one template
+by two people with different emails and phones are kept apart. Texts
+are compared through MinHash signatures of their word 3-grams, computed in
+the worker processes (engine.parse_file(signature=True)), and only CVs that
+share a band of their signature (locality-sensitive hashing) are compared
+at all, so a batch is grouped in about linear time rather than by
+comparing every pair.
+
+The candidate_id is the Filename of the first CV of its group. Rows that
+are already written keep their id: a CV that links two existing groups
+joins the older one without merging them.
+
+When a run is resumed, the rows it already wrote go back into the index
+with add_written() before any new CV, so later versions of those CVs join
+their groups. Their texts are not read again, so they are matched by email
+and phone only.
+"""
+
+import hashlib
+import re
+
+import engine
+
+# Row key holding the signature; writers only write their own columns
+SIGNATURE_KEY = '_signature'
+CANDIDATE_FIELD = 'candidate_id'
+FIELDNAMES = engine.FIELDNAMES + [CANDIDATE_FIELD]
+
+SHINGLE_SIZE = 3
+SIGNATURE_SIZE = 64
+# 16 bands of 4 values: texts about 50% alike or more share a band with
+# good odds, and the signatures then decide
+BAND_SIZE = 4
+SIMILARITY_THRESHOLD = 0.6
+# Empty bins borrow the value of a later bin, shifted above any real value
+_DENSIFY_OFFSET = 2 ** 64 // SIGNATURE_SIZE
+MIN_PHONE_DIGITS = 7
+
+WORD_RE = re.compile(r'\w+')
+NON_DIGIT_RE = re.compile(r'\D')
+
+
+def text_signature(text):
+    """
+    MinHash signature of the word 3-grams of text, as a list of
+    SIGNATURE_SIZE ints, or None for texts too short to have any.
+
+    One-permutation hashing: each shingle is hashed once and kept as the
+    minimum of one of SIGNATURE_SIZE bins, which estimates the same
+    similarity as SIGNATURE_SIZE separate hash functions at a fraction of
+    the cost.
+    """
+    words = WORD_RE.findall(text.lower())
+    shingles = {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    if not shingles:
+        return None
+    mins = [None] * SIGNATURE_SIZE
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'little')
+        value, slot = divmod(value, SIGNATURE_SIZE)
+        if mins[slot] is None or value < mins[slot]:
+            mins[slot] = value
+    for slot in range(SIGNATURE_SIZE):
+        if mins[slot] is None:
+            distance = 1
+            while mins[(slot + distance) % SIGNATURE_SIZE] is None:
+                distance += 1
+            mins[slot] = mins[(slot + distance) % SIGNATURE_SIZE] + distance * _DENSIFY_OFFSET
+    return mins
+
+
+def similarity(signature, other):
+    """Estimated Jaccard similarity of the two texts behind two signatures."""
+    return sum(a == b for a, b in zip(signature, other)) / len(signature)
+
+
+def identity_keys(info):
+    """The normalized email and phone of a row, as index keys."""
+    keys = []
+    email = (info.get('Email') or '').strip().lower()
+    if email:
+        keys.append('email:' + email)
+    phone = NON_DIGIT_RE.sub('', engine.clean_phone_number(info.get('Phone') or '') or '')
+    if len(phone) >= MIN_PHONE_DIGITS:
+        keys.append('phone:' + phone)
+    return keys
+
+
+def _contradicts(keys, other):
+    # Different email and different phone: two people, however alike the
+    # CVs read. A new email or phone alone is a new version of the CV.
+    return len(keys) == len(other) == 2 and not set(keys) & set(other)
+
+
+def _bands(signature):
+    for start in range(0, len(signature), BAND_SIZE):
+        yield start, tuple(signature[start:start + BAND_SIZE])
+
+
+class CandidateRecord(engine.CVRecord):
+    """An engine.CVRecord that also holds the candidate_id."""
+
+    __slots__ = (CANDIDATE_FIELD,)
+    fields = tuple(FIELDNAMES)
+
+    def __init__(self, Filename='', Name='', Email='', Phone='', University='', Grade='', candidate_id=''):
+        super().__init__(Filename, Name, Email, Phone, University, Grade)
+        self.candidate_id = candidate_id
+
+
+class DuplicateIndex:
+    def __init__(self, threshold=SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self._keys = {}
+        # (band start, band values) -> numbers of the rows with that band
+        self._buckets = {}
+        self._signatures = []
+        self._identities = []
+        self._groups = []
+        # candidate_id of each group, in the order the groups were found
+        self.candidate_ids = []
+        self._group_of = {}
+
+    def __len__(self):
+        return len(self._groups)
+
+    @property
+    def candidates(self):
+        return len(self.candidate_ids)
+
+    def add(self, info):
+        """Index a row (with its SIGNATURE_KEY if it has one) and return its candidate_id."""
+        keys = identity_keys(info)
+        signature = info.get(SIGNATURE_KEY)
+        bands = list(_bands(signature)) if signature else []
+        groups = {self._keys[key] for key in keys if key in self._keys}
+        compared = set()
+        for band in bands:
+            for row in self._buckets.get(band, ()):
+                if row in compared or self._groups[row] in groups:
+                    continue
+                compared.add(row)
+                if _contradicts(keys, self._identities[row]):
+                    continue
+                if similarity(signature, self._signatures[row]) >= self.threshold:
+                    groups.add(self._groups[row])
+        if groups:
+            group = min(groups)
+        else:
+            group = self._new_group(info.get('Filename') or f'candidate-{len(self.candidate_ids) + 1}')
+        self._add_row(group, keys, signature, bands)
+        return self.candidate_ids[group]
+
+    def add_written(self, info):
+        """
+        Index a row written by an earlier run under the candidate_id it was
+        given, and return that id. Only its email and phone are indexed.
+        """
+        candidate_id = info.get(CANDIDATE_FIELD) or info.get('Filename')
+        group = self._group_of.get(candidate_id)
+        if group is None:
+            group = self._new_group(candidate_id)
+        self._add_row(group, identity_keys(info), None, [])
+        return candidate_id
+
+    def _new_group(self, candidate_id):
+        group = len(self.candidate_ids)
+        self.candidate_ids.append(candidate_id)
+        self._group_of.setdefault(candidate_id, group)
+        return group
+
+    def _add_row(self, group, keys, signature, bands):
+        row = len(self._groups)
+        self._groups.append(group)
+        self._signatures.append(signature)
+        self._identities.append(keys)
+        for key in keys:
+            self._keys.setdefault(key, group)
+        for band in bands:
+            self._buckets.setdefault(band, []).append(row)
@@ -0,0 +1,730 @@
+"""
+GUI-free CV extraction engine.
+
+Everything needed to turn a PDF CV into a row of extracted fields lives here,
+so it can be used from the command line or on servers without tkinter.
+"""
+
+import bisect
+import hashlib
+import itertools
+import json
+import os
+import re
+import sys
+import time
+
+try:
+    import re._parser as _sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse as _sre_parse
+
+import backends
+
+FIELDNAMES = ['Filename', 'Name', 'Email', 'Phone', 'University', 'Grade']
+# The fields extract_information finds in a text
+EXTRACTED_FIELDS = FIELDNAMES[1:]
+# Row key holding the file's SHA-256 with parse_file(file_hash=True); writers
+# only write their own columns
+HASH_KEY = '_file_hash'
+
+# Bump when extraction logic changes in a way the pattern lists don't show.
+ENGINE_VERSION = '1'
+
+
+class CVRecord:
+    """
+    One CV's result as a fixed-field record, for holding many rows in
+    memory: a slotted object takes about a third of the space of the
+    equivalent dict. Fields are attributes named as in FIELDNAMES, and
+    record['Email'] and record.get('Email') work as they do on a result dict.
+    Subclasses that add slots list every field in `fields`.
+    """
+
+    __slots__ = tuple(FIELDNAMES)
+    fields = tuple(FIELDNAMES)
+
+    def __init__(self, Filename='', Name='', Email='', Phone='', University='', Grade=''):
+        self.Filename = Filename
+        self.Name = Name
+        self.Email = Email
+        self.Phone = Phone
+        self.University = University
+        self.Grade = Grade
+
+    @classmethod
+    def from_dict(cls, info):
+        # Keys that are not fields (such as the private _signature) are left out
+        return cls(*(info.get(field, '') for field in cls.fields))
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in self.fields}
+
+    def __getitem__(self, field):
+        if field not in self.fields:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def get(self, field, default=None):
+        return getattr(self, field) if field in self.fields else default
+
+    def __eq__(self, other):
+        if not isinstance(other, CVRecord):
+            return NotImplemented
+        return self.fields == other.fields and all(getattr(self, field) == getattr(other, field)
+                                                   for field in self.fields)
+
+    def __repr__(self):
+        values = ', '.join(f'{field}={getattr(self, field)!r}' for field in self.fields)
+        return f'{type(self).__name__}({values})'
+
+
+def iter_pdf_pages(pdf_path, on_error=None, backend=None, max_bytes=None):
+    """
+    Yield the text of each page in turn, reading no further than the caller asks.
+
+    pdf_path is a path or an already open backends.MappedPdf. The file is
+    memory-mapped, and refused before parsing if it is over max_bytes or not
+    a PDF. backend is a backends name or object (default: PyPDF2, see
+    backends.py). A PDF that cannot be read ends the iteration early; the
+    exception is passed to on_error if given, otherwise printed.
+    """
+    if backend is None or isinstance(backend, str):
+        backend = backends.get_backend(backend)
+    try:
+        if isinstance(pdf_path, backends.MappedPdf):
+            yield from backend.iter_pages(pdf_path.data)
+        else:
+            with backends.MappedPdf(pdf_path, max_bytes) as data:
+                yield from backend.iter_pages(data)
+    except Exception as e:
+        if on_error is not None:
+            on_error(e)
+        else:
+            print(f"Error reading PDF {getattr(pdf_path, 'path', pdf_path)}: {e}", file=sys.stderr)
+
+
+def extract_text_from_pdf(pdf_path, max_pages=None, backend=None, max_bytes=None):
+    pages = iter_pdf_pages(pdf_path, backend=backend, max_bytes=max_bytes)
+    if max_pages is not None:
+        pages = itertools.islice(pages, max_pages)
+    return ''.join(page_text + "\n" for page_text in pages if page_text)
+
+
+def clean_phone_number(phone):
+    if not phone:
+        return phone
+    # Remove extra whitespace, dashes, parentheses, and normalize
+    phone = re.sub(r'[\s\-\(\)]+', '', phone.strip())
+    # Standardize +234 prefix for Nigerian numbers
+    phone = re.sub(r'^0([7-9][0-1][0-9]{8})$', r'+234\1', phone)
+    phone = re.sub(r'^\+?234\s*\+?234', '+234', phone)
+    return phone
+
+
+def clean_university_name(university):
+    if not university:
+        return university
+    university = re.sub(r'\s+', ' ', university.strip())
+    # Remove dates (e.g., 2023-2024, Nov 2023)
+    university = re.sub(r'\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{4}\b', '', university)
+    university = re.sub(r'\b\d{4}\s*-\s*\d{4}\b', '', university)
+    university = re.sub(r'\b\d{4}\s*-\s*Present\b', '', university)
+    # Remove specific locations only if they follow a comma
+    university = re.sub(r',\s*(?:Lagos|Port Harcourt|Ondo|Enugu|Nigeria)\b', '', university)
+    return university.strip()
+
+
+def clean_grade(grade):
+    if not grade:
+        return grade
+    grade = re.sub(r'\s+', ' ', grade.strip())
+    # Standardize grade formats
+    grade = re.sub(r'Second\s*Class\s*Upper\s*(Division|Honours)?', 'Second Class Upper Division', grade, flags=re.IGNORECASE)
+    grade = re.sub(r'Second\s*Class\s*Lower\s*(Division|Honours)?', 'Second Class Lower Division', grade, flags=re.IGNORECASE)
+    grade = re.sub(r'First\s*Class\s*(Division|Honours)?', 'First Class', grade, flags=re.IGNORECASE)
+    grade = re.sub(r'Third\s*Class\s*(Division|Honours)?', 'Third Class', grade, flags=re.IGNORECASE)
+    return grade
+
+
+def clean_name(name):
+    if not name:
+        return name
+    name = re.sub(r'\s+', ' ', name.strip())
+    name = re.sub(r'\b(?:CV|Resume|Curriculum|Vitae)\b', '', name, flags=re.IGNORECASE)
+    # Capitalize each word properly
+    name_parts = name.split()
+    cleaned_parts = [part[0].upper() + part[1:].lower() for part in name_parts if part]
+    return ' '.join(cleaned_parts)
+
+
+EMAIL_PATTERN = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+
+# Phone and grade patterns are tried in priority order: the first pattern
+# with any match in the document decides the field.
+PHONE_PATTERNS = [
+    r'\+?234\s*[0-9]{3}\s*[0-9]{3}\s*[0-9]{4}',  # +234 XXX XXX XXXX
+    r'\+?234\s*[0-9]{10}',  # +234XXXXXXXXXX
+    r'\+?234\s*\(?0\)?[0-9]{3}\s*[0-9]{3}\s*[0-9]{4}',  # +234(0)XXX XXX XXXX
+    r'0[7-9][0-1][0-9]{8}',  # 0XXXXXXXXXX
+    r'\+?[0-9]{1,4}[-.\s]?\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}',  # International with dashes/parentheses
+    r'\+?[0-9]{10,15}',  # Long international numbers
+]
+
+GRADE_PATTERNS = [
+    r'Second\s*Class\s*Upper\s*(Division|Honours)?',
+    r'Second\s*Class\s*Lower\s*(Division|Honours)?',
+    r'First\s*Class\s*(Division|Honours)?',
+    r'Third\s*Class\s*(Division|Honours)?',
+    r'Pass\s*Class',
+    r'Distinction',
+    r'Merit',
+    r'Credit',
+    r'GPA[:\s]*([0-9]\.[0-9]{1,2})',
+    r'([0-9]\.[0-9]{1,2})/[0-9]\.[0-9]{1,2}',
+    r'([0-9]\.[0-9]{1,2})\s*GPA',
+    r'([0-9]{1,2})%',
+    r'([A-F][+-]?)\s*Grade',
+    r'([A-F][+-]?)\s*\([0-9]\.[0-9]{1,2}\)',
+]
+
+UNIVERSITY_KEYWORDS = [
+    'university', 'college', 'institute', 'school', 'academy', 'polytechnic', 'law school'
+]
+UNIVERSITY_EXCLUDE_WORDS = ['email', 'phone', 'address', 'cv', 'resume', 'curriculum', 'vitae', 'grade', 'gpa']
+
+NAME_PATTERNS = [
+    r'^([A-Z\s]+)$',  # All-caps names in first lines
+    r'Name[:\s]*([A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,3})',
+    r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,3})\s*(?:CV|Resume|Curriculum\s*Vitae)',
+    r'^([A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+){1,3})$',  # Mixed case names
+]
+NAME_EXCLUDE_WORDS = ['cv', 'resume', 'curriculum', 'vitae', 'email', 'phone', 'address',
+                      'university', 'college', 'institute', 'school', 'academy', 'polytechnic',
+                      'law', 'second', 'first', 'third', 'class', 'upper', 'lower', 'nigeria']
+
+
+def _substring_regex(words):
+    # Matches wherever any of the words occurs, like any(word in s for word in words)
+    return re.compile('|'.join(re.escape(word) for word in words))
+
+
+# Characters that re.IGNORECASE matches against ASCII letters but str.lower()
+# does not map onto them (or maps onto two characters)
+_UNSAFE_FOLD_RE = re.compile('[\u0130\u0131\u017f]')
+
+
+def fold_text(text):
+    """Lowercase text for case-insensitive scanning, or None if that would be inexact."""
+    if _UNSAFE_FOLD_RE.search(text):
+        return None
+    return text.lower()
+
+
+_DIGIT_CODES = range(ord('0'), ord('9') + 1)
+# Runs of a few digits (years, dates) are in nearly every CV; only longer
+# required runs are worth the scan that measures a document's longest run.
+MIN_GATED_DIGIT_RUN = 6
+_DIGIT_RUN_RE = re.compile('[0-9]{%d,}' % MIN_GATED_DIGIT_RUN)
+
+
+def _is_digit_item(op, av):
+    # A single-character item that can only match an ASCII digit
+    if op is _sre_parse.LITERAL:
+        return av in _DIGIT_CODES
+    if op is _sre_parse.IN:
+        return all((kind is _sre_parse.LITERAL and value in _DIGIT_CODES)
+                   or (kind is _sre_parse.RANGE and value[0] in _DIGIT_CODES and value[1] in _DIGIT_CODES)
+                   for kind, value in av)
+    return False
+
+
+def _pattern_triggers(items, literals):
+    """
+    Add to literals the literal strings every match of the parsed items must
+    contain, and return the longest run of digits every match must contain.
+    Only what the items spell out unconditionally counts, so the result can
+    miss requirements but never invents one.
+    """
+    run = []
+    digits = longest_digits = 0
+    for op, av in items:
+        if op is _sre_parse.LITERAL:
+            run.append(chr(av))
+        elif run:
+            literals.append(''.join(run))
+            run = []
+        if _is_digit_item(op, av):
+            digits += 1
+        elif op in (_sre_parse.MAX_REPEAT, _sre_parse.MIN_REPEAT) and len(av[2]) == 1 and _is_digit_item(*av[2][0]):
+            # [0-9]{m,n}: at least m more digits, and an optional one keeps the run going
+            digits += av[0]
+        else:
+            digits = 0
+            # A group with its own (?i:...) flag matches more than its literals
+            if op is _sre_parse.SUBPATTERN and not av[1] & re.IGNORECASE:
+                longest_digits = max(longest_digits, _pattern_triggers(av[-1], literals))
+        longest_digits = max(longest_digits, digits)
+    if run:
+        literals.append(''.join(run))
+    return longest_digits
+
+
+def pattern_triggers(pattern):
+    """
+    (literals, digit_run) for a compiled pattern: substrings and a length of
+    consecutive ASCII digits that a text must contain for the pattern to
+    match it. A digit_run below MIN_GATED_DIGIT_RUN is reported as 0.
+    """
+    if pattern.flags & re.IGNORECASE:
+        return (), 0
+    literals = []
+    digit_run = _pattern_triggers(_sre_parse.parse(pattern.pattern, pattern.flags), literals)
+    return tuple(literals), digit_run if digit_run >= MIN_GATED_DIGIT_RUN else 0
+
+
+def longest_digit_run(text):
+    """Length of the longest run of ASCII digits in text, or 0 if under MIN_GATED_DIGIT_RUN."""
+    return max(map(len, _DIGIT_RUN_RE.findall(text)), default=0)
+
+
+def may_match(triggers, text):
+    """Cheap pre-check: False if text lacks a literal the pattern needs."""
+    for literal in triggers[0]:
+        if literal not in text:
+            return False
+    return True
+
+
+class PatternFamily:
+    """
+    An ordered list of precompiled patterns; the first one that matches wins.
+
+    Case-insensitive families are also compiled in lowercase without
+    re.IGNORECASE. Scanning the lowercased text with those lets the regex
+    engine use its fast literal-prefix search, which it cannot do for
+    case-insensitive patterns. Match offsets are the same in both texts, so
+    values are always sliced from the original.
+
+    Each pattern also has triggers (see pattern_triggers): a pattern is
+    skipped without a regex scan when a substring it needs, such as '234'
+    or '%', is not in the text, or its digits cannot fit in the longest run
+    of digits the text has.
+    """
+
+    def __init__(self, patterns, flags=0):
+        self.patterns = [re.compile(pattern, flags) for pattern in patterns]
+        self.folded = None
+        if flags & re.IGNORECASE:
+            self.folded = [re.compile(_fold_pattern(pattern), flags & ~re.IGNORECASE) for pattern in patterns]
+        # Triggers are exact substrings, so they are only used on the text
+        # the patterns are matched case-sensitively against
+        self.triggers = [pattern_triggers(pattern) for pattern in self.folded or self.patterns]
+
+    def candidates(self, text, folded_text=None):
+        """
+        Yield (index, pattern, scanned_text) for the patterns, in priority
+        order, that the triggers do not rule out for this text.
+        """
+        if self.folded is not None:
+            if folded_text is None:
+                # Case-insensitive scan, the triggers do not apply
+                for index, pattern in enumerate(self.patterns):
+                    yield index, pattern, text
+                return
+            patterns, text = self.folded, folded_text
+        else:
+            patterns = self.patterns
+        longest_run = None
+        for index, pattern in enumerate(patterns):
+            if not may_match(self.triggers[index], text):
+                continue
+            digit_run = self.triggers[index][1]
+            if digit_run:
+                if longest_run is None:
+                    longest_run = longest_digit_run(text)
+                if longest_run < digit_run:
+                    continue
+            yield index, pattern, text
+
+    def search(self, text, folded_text=None):
+        """Return (index, match) for the first pattern in priority order that matches."""
+        for index, pattern, scanned in self.candidates(text, folded_text):
+            match = pattern.search(scanned)
+            if match:
+                return index, match
+        return None, None
+
+    def value(self, index, match, text):
+        """What re.findall would have returned for this match, taken from text."""
+        group = 1 if self.patterns[index].groups else 0
+        start, end = match.span(group)
+        if start == -1:
+            return ''
+        return text[start:end]
+
+
+def _fold_pattern(pattern):
+    if re.search(r'\\[A-Z]', pattern):
+        raise ValueError(f"cannot lowercase pattern with uppercase escapes: {pattern}")
+    return pattern.lower()
+
+
+def _keyword_lines(lowered, lowered_lines, keywords):
+    """Indexes of the lines containing any keyword, in order, each listed once."""
+    # End offset (past the newline) of every line, for mapping hits to lines
+    line_ends = list(itertools.accumulate(len(line) + 1 for line in lowered_lines))
+    found = set()
+    for keyword in keywords:
+        pos = lowered.find(keyword)
+        while pos != -1:
+            line = bisect.bisect_right(line_ends, pos)
+            found.add(line)
+            # Any further hit on this line adds nothing, continue on the next
+            pos = lowered.find(keyword, line_ends[line])
+    return sorted(found)
+
+
+class Gazetteer:
+    """
+    Known institution names, matched exactly (ignoring case and line breaks).
+
+    When one is given to extract_information, a known name found in the CV
+    is used as the University in preference to the keyword heuristic. The
+    longest known name wins, then the earliest in the text.
+    """
+
+    def __init__(self, names):
+        cleaned = {' '.join(name.split()) for name in names}
+        cleaned.discard('')
+        self.names = sorted(cleaned, key=lambda name: (-len(name), name))
+        self._canonical = {name.lower(): name for name in self.names}
+        self.fingerprint = hashlib.sha1('\n'.join(self.names).encode('utf-8')).hexdigest()[:12]
+        self._regex = None
+        if self.names:
+            self._regex = re.compile(r'\b(?:' + '|'.join(
+                r'\s+'.join(re.escape(word) for word in name.lower().split()) for name in self.names
+            ) + r')\b')
+
+    @classmethod
+    def from_file(cls, path):
+        """One name per line; blank lines and lines starting with # are ignored."""
+        with open(path, encoding='utf-8') as file:
+            return cls(line for line in file if not line.lstrip().startswith('#'))
+
+    def find(self, lowered_text):
+        if self._regex is None:
+            return None
+        best = None
+        # Names can overlap ('Lagos State' in 'Lagos State University of
+        # Lagos'), so each search starts just after the previous match
+        # began rather than where it ended; at one position the alternation
+        # tries the longest names first
+        match = self._regex.search(lowered_text)
+        while match is not None:
+            name = self._canonical[' '.join(match.group().split())]
+            if best is None or len(name) > len(best):
+                best = name
+            match = self._regex.search(lowered_text, match.start() + 1)
+        return best
+
+
+EMAIL_RE = re.compile(EMAIL_PATTERN)
+EMAIL_TRIGGERS = pattern_triggers(EMAIL_RE)
+PHONE_FAMILY = PatternFamily(PHONE_PATTERNS)
+GRADE_FAMILY = PatternFamily(GRADE_PATTERNS, re.IGNORECASE)
+# A keyword containing another keyword can never add a match ('law school')
+UNIVERSITY_SEARCH_KEYWORDS = [
+    keyword for keyword in UNIVERSITY_KEYWORDS
+    if not any(other != keyword and other in keyword for other in UNIVERSITY_KEYWORDS)
+]
+UNIVERSITY_EXCLUDE_RE = _substring_regex(UNIVERSITY_EXCLUDE_WORDS)
+NAME_RES = [re.compile(pattern) for pattern in NAME_PATTERNS]
+NAME_EXCLUDE_RE = _substring_regex(NAME_EXCLUDE_WORDS)
+WHITESPACE_RE = re.compile(r'\s+')
+
+# Identifies the extraction rules, so cached results go stale when they change.
+EXTRACTOR_VERSION = ENGINE_VERSION + '-' + hashlib.sha1(json.dumps([
+    EMAIL_PATTERN, PHONE_PATTERNS, GRADE_PATTERNS, UNIVERSITY_KEYWORDS,
+    UNIVERSITY_EXCLUDE_WORDS, NAME_PATTERNS, NAME_EXCLUDE_WORDS,
+]).encode('utf-8')).hexdigest()[:12]
+
+
+def extract_information(text, gazetteer=None, trace=None):
+    """
+    Extract the CV fields from text. If trace is a dict, it is filled with
+    which pattern produced each field, e.g. {'Phone': 'phone[3]'}.
+    """
+    info = {
+        'Name': '',
+        'Email': '',
+        'Phone': '',
+        'University': '',
+        'Grade': ''
+    }
+    if trace is not None:
+        trace.clear()
+
+    # Extract email
+    email_match = EMAIL_RE.search(text) if may_match(EMAIL_TRIGGERS, text) else None
+    if email_match:
+        info['Email'] = email_match.group()
+        if trace is not None:
+            trace['Email'] = 'email'
+
+    # Extract phone number: every match of the winning pattern, longest wins
+    index, match = PHONE_FAMILY.search(text)
+    if match is not None:
+        phone_matches = PHONE_FAMILY.patterns[index].findall(text, match.start())
+        info['Phone'] = clean_phone_number(max(phone_matches, key=len))
+        if trace is not None:
+            trace['Phone'] = f'phone[{index}]'
+
+    # Extract university
+    lines = text.split('\n')
+    lowered = text.lower()
+    info['University'] = find_university(lines, lowered, gazetteer, trace)
+
+    # Extract grade: first match of the winning pattern
+    folded = None if _UNSAFE_FOLD_RE.search(text) else lowered
+    index, match = GRADE_FAMILY.search(text, folded)
+    if match is not None:
+        info['Grade'] = clean_grade(GRADE_FAMILY.value(index, match, text))
+        if trace is not None:
+            trace['Grade'] = f'grade[{index}]'
+
+    # Extract name
+    info['Name'] = find_name(text, lines, trace)
+    return info
+
+
+def find_university(lines, lowered, gazetteer=None, trace=None):
+    """The University field, from the text split into lines and the lowercased text."""
+    if gazetteer is not None:
+        university = gazetteer.find(lowered)
+        if university:
+            if trace is not None:
+                trace['University'] = 'gazetteer'
+            return university
+    lowered_lines = lowered.split('\n')
+    university_candidates = []
+    for i in _keyword_lines(lowered, lowered_lines, UNIVERSITY_SEARCH_KEYWORDS):
+        university_name = lines[i].strip()
+        # Combine with previous/next lines if they seem part of the name
+        for j in (i - 1, i + 1):
+            if 0 <= j < len(lines) and lines[j].strip():
+                if not UNIVERSITY_EXCLUDE_RE.search(lowered_lines[j]):
+                    university_name += ' ' + lines[j].strip()
+        university_name = WHITESPACE_RE.sub(' ', university_name).strip()
+        if len(university_name) > 5 and len(university_name) < 200:
+            university_candidates.append(university_name)
+
+    if university_candidates:
+        if trace is not None:
+            trace['University'] = 'keyword'
+        return clean_university_name(max(university_candidates, key=len))
+    return ''
+
+
+def find_name(text, lines, trace=None):
+    """The Name field: the first of the opening lines that looks like a name, else anywhere."""
+    for line in lines[:10]:
+        line = line.strip()
+        if len(line) > 0:
+            for index, name_re in enumerate(NAME_RES):
+                name_match = name_re.match(line)
+                if name_match:
+                    potential_name = name_match.group(1)
+                    if not NAME_EXCLUDE_RE.search(potential_name.lower()):
+                        name = clean_name(potential_name)
+                        if trace is not None:
+                            trace['Name'] = f'name[{index}]'
+                        if name:
+                            return name
+                        break
+
+    for index, name_re in enumerate(NAME_RES[1:], 1):
+        name_match = name_re.search(text)
+        if name_match:
+            potential_name = name_match.group(1)
+            if not NAME_EXCLUDE_RE.search(potential_name.lower()):
+                if trace is not None:
+                    trace['Name'] = f'name[{index}] anywhere'
+                return clean_name(potential_name)
+    return ''
+
+
+def extract_information_from_pages(pages, max_pages=None, early_exit=False, gazetteer=None, trace=None):
+    """
+    Extract fields from an iterable of page texts, returning (text, info).
+
+    Pages are pulled one at a time. Reading stops after max_pages pages, and
+    with early_exit as soon as every field has been found, so long CVs cost
+    about the same as short ones. Fields can then differ from a full-document
+    parse (e.g. a longer university name on a later page is not seen).
+    """
+    pieces = []
+    info = None
+    # Fields not yet found in any page; each page is only looked at on its
+    # own, so the cost stays linear in the number of pages
+    missing = set(EXTRACTED_FIELDS) if early_exit else None
+    for page_number, page_text in enumerate(pages, 1):
+        if page_text:
+            pieces.append(page_text + "\n")
+            if missing:
+                page_info = extract_information(page_text + "\n", gazetteer)
+                missing = {field for field in missing if not page_info[field]}
+                if not missing:
+                    info = extract_information(''.join(pieces), gazetteer, trace)
+                    if all(info.values()):
+                        break
+                    # Some field depends on where it was found (a bare name
+                    # only counts in the opening lines): read on to the end
+                    info = missing = None
+        if max_pages is not None and page_number >= max_pages:
+            break
+    text = ''.join(pieces)
+    if info is None and text:
+        info = extract_information(text, gazetteer, trace)
+    return text, info
+
+
+def _read_pdf(pdf, max_pages, early_exit, gazetteer, metrics, backend, on_error=None):
+    # Returns (text, info, error); info is None unless page-limited reading
+    # needed it, error is the exception that stopped reading, if any
+    errors = []
+    pages = iter_pdf_pages(pdf, on_error=errors.append, backend=backend)
+    trace = None
+    if metrics is not None:
+        pages = metrics.counted(pages)
+        trace = metrics.matched
+    if max_pages is None and not early_exit:
+        text, info = ''.join(page_text + "\n" for page_text in pages if page_text), None
+    else:
+        text, info = extract_information_from_pages(pages, max_pages, early_exit, gazetteer, trace)
+    error = errors[0] if errors else None
+    if error is not None:
+        if metrics is not None:
+            metrics.fail('error', error)
+        if on_error is not None:
+            on_error(error)
+        elif metrics is None:
+            print(f"Error reading PDF {pdf.path}: {error}", file=sys.stderr)
+    return text, info, error
+
+
+def _lap(metrics, stage, since):
+    now = time.perf_counter()
+    metrics.add_stage(stage, now - since)
+    return now
+
+
+def parse_file(pdf_path, cache=None, max_pages=None, early_exit=False, gazetteer=None, metrics=None,
+               backend=None, max_file_size=None, signature=False, on_error=None, file_hash=False):
+    """
+    Parse one PDF into a result row, or None if it has no extractable text.
+
+    With a cache (see cache.ResultCache), files seen before are looked up by
+    content hash and skip PDF parsing, and also field extraction unless the
+    extraction rules changed since. max_pages and early_exit limit how much
+    of the PDF is read, see extract_information_from_pages. gazetteer is an
+    optional Gazetteer of known institutions. metrics is an optional
+    metrics.FileMetrics to record stage timings and outcomes in. backend
+    names the PDF text extractor, see backends.get_backend. Files over
+    max_file_size bytes, and files that are not PDFs, are skipped before
+    any parsing. With signature, the row also carries a MinHash signature
+    of the text for duplicate detection, see dedupe.py. With file_hash, it
+    carries the SHA-256 of the file under HASH_KEY. Why a file was
+    refused or could not be read is passed to on_error if given, otherwise
+    printed (unless metrics records it).
+    """
+    backend = backends.get_backend(backend)
+    started = time.perf_counter() if metrics is not None else None
+    try:
+        pdf = backends.MappedPdf(pdf_path, max_file_size)
+    except (OSError, backends.RejectedFile) as e:
+        status = 'rejected' if isinstance(e, backends.RejectedFile) else 'error'
+        if metrics is not None:
+            metrics.fail(status, e)
+        if on_error is not None:
+            on_error(e)
+        elif metrics is None:
+            if status == 'rejected':
+                print(f"Skipping {pdf_path}: {e}", file=sys.stderr)
+            else:
+                print(f"Error reading PDF {pdf_path}: {e}", file=sys.stderr)
+        return None
+    with pdf:
+        return _parse_mapped(pdf, cache, max_pages, early_exit, gazetteer, metrics, backend, started, signature,
+                             on_error, file_hash)
+
+
+def _parse_mapped(pdf, cache, max_pages, early_exit, gazetteer, metrics, backend, started, signature=False,
+                  on_error=None, file_hash=False):
+    trace = metrics.matched if metrics is not None else None
+    text = None
+    digest = None
+    if cache is None:
+        text, info, _ = _read_pdf(pdf, max_pages, early_exit, gazetteer, metrics, backend, on_error)
+        if metrics is not None:
+            started = _lap(metrics, 'pdf_text', started)
+        if info is None and text:
+            info = extract_information(text, gazetteer, trace)
+            if metrics is not None:
+                _lap(metrics, 'fields', started)
+    else:
+        content_hash = digest = cache.file_hash(pdf.data)
+        if max_pages is not None or early_exit:
+            # Text read under a page limit must not be served to a full parse
+            content_hash += f':pages={max_pages}:early={int(early_exit)}'
+        if backend.name != backends.DEFAULT_BACKEND:
+            # Other extractors produce different text from the same file
+            content_hash += f':backend={backend.name}'
+        variant = f'gazetteer={gazetteer.fingerprint}' if gazetteer is not None else ''
+        if metrics is not None:
+            started = _lap(metrics, 'hash', started)
+        info = cache.get_result(content_hash, variant)
+        if info is None:
+            text = cache.get_text(content_hash)
+            if metrics is not None:
+                started = _lap(metrics, 'cache', started)
+            error = None
+            if text is None:
+                text, info, error = _read_pdf(pdf, max_pages, early_exit, gazetteer, metrics, backend, on_error)
+                # Unreadable files are not cached, the next run reports the error again
+                if error is None:
+                    cache.put_text(content_hash, text)
+                if metrics is not None:
+                    started = _lap(metrics, 'pdf_text', started)
+            elif metrics is not None:
+                metrics.cache_hit = True
+            if info is None:
+                info = extract_information(text, gazetteer, trace) if text else {}
+                if metrics is not None:
+                    started = _lap(metrics, 'fields', started)
+            if error is None:
+                cache.put_result(content_hash, info, variant)
+        elif metrics is not None:
+            metrics.cache_hit = True
+            _lap(metrics, 'cache', started)
+    if metrics is not None and text is not None:
+        metrics.text_length = len(text)
+    if not info:
+        if metrics is not None and metrics.status == 'ok':
+            metrics.fail('no_text', "no extractable text")
+        return None
+    info['Filename'] = os.path.basename(pdf.path)
+    if file_hash:
+        # Hashed here, where the file is already mapped, so the caller need not read it again
+        info[HASH_KEY] = digest or hashlib.sha256(pdf.data).hexdigest()
+    if signature:
+        if text is None:
+            # The result came from the cache without its text
+            text = cache.get_text(content_hash) or ''
+        add_signature(info, text)
+    return info
+
+
+def add_signature(info, text):
+    import dedupe  # dedupe needs this module, so not imported at the top
+    info[dedupe.SIGNATURE_KEY] = dedupe.text_signature(text)
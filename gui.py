@@ -0,0 +1,288 @@
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox
+import os
+import threading
+
+import backends
+import cache
+import jobs
+import ocr
+import writers
+
+RESULTS_FILE = 'cv_results.csv'
+
+class CVParser:
+    def __init__(self, root):
+        self.root = root
+        self.root.title("CV Parser - Extract Information from PDF CVs")
+        self.root.geometry("800x600")
+        self.root.configure(bg='#f0f0f0')
+        self.selected_files = []
+        self.job = None
+        self.create_widgets()
+
+    def create_widgets(self):
+        # Main title
+        title_label = tk.Label(
+            self.root, 
+            text="CV Parser", 
+            font=("Arial", 24, "bold"),
+            bg='#f0f0f0',
+            fg='#2c3e50'
+        )
+        title_label.pack(pady=20)
+        
+        # Description
+        desc_label = tk.Label(
+            self.root,
+            text="Select PDF CV files to extract information (Name, Email, Phone, University, Grade)",
+            font=("Arial", 12),
+            bg='#f0f0f0',
+            fg='#34495e'
+        )
+        desc_label.pack(pady=10)
+        
+        # File selection frame
+        file_frame = tk.Frame(self.root, bg='#f0f0f0')
+        file_frame.pack(pady=20, padx=20, fill='x')
+        
+        # Select files button
+        self.select_btn = tk.Button(
+            file_frame,
+            text="Select PDF Files",
+            command=self.select_files,
+            font=("Arial", 12),
+            bg='#3498db',
+            fg='white',
+            relief='flat',
+            padx=20,
+            pady=10
+        )
+        self.select_btn.pack(side='left', padx=(0, 10))
+        
+        # Clear files button
+        self.clear_btn = tk.Button(
+            file_frame,
+            text="Clear Selection",
+            command=self.clear_files,
+            font=("Arial", 12),
+            bg='#e74c3c',
+            fg='white',
+            relief='flat',
+            padx=20,
+            pady=10
+        )
+        self.clear_btn.pack(side='left')
+        
+        # Selected files display
+        files_frame = tk.Frame(self.root, bg='#f0f0f0')
+        files_frame.pack(pady=10, padx=20, fill='both', expand=True)
+        
+        tk.Label(
+            files_frame,
+            text="Selected Files:",
+            font=("Arial", 12, "bold"),
+            bg='#f0f0f0',
+            fg='#2c3e50'
+        ).pack(anchor='w')
+        
+        self.files_listbox = tk.Listbox(
+            files_frame,
+            height=8,
+            font=("Arial", 10),
+            bg='white',
+            relief='solid',
+            borderwidth=1
+        )
+        self.files_listbox.pack(fill='both', expand=True, pady=(5, 0))
+        
+        scrollbar = tk.Scrollbar(files_frame, orient='vertical')
+        scrollbar.pack(side='right', fill='y')
+        self.files_listbox.config(yscrollcommand=scrollbar.set)
+        scrollbar.config(command=self.files_listbox.yview)
+        
+        # Progress bar
+        self.progress = ttk.Progressbar(
+            self.root,
+            orient='horizontal',
+            length=400,
+            mode='determinate'
+        )
+        self.progress.pack(pady=20)
+        
+        # Pause and cancel buttons, enabled while parsing
+        control_frame = tk.Frame(self.root, bg='#f0f0f0')
+        control_frame.pack()
+        
+        self.pause_btn = tk.Button(
+            control_frame,
+            text="Pause",
+            command=self.toggle_pause,
+            font=("Arial", 10),
+            width=8,
+            state='disabled'
+        )
+        self.pause_btn.pack(side='left', padx=5)
+        
+        self.cancel_btn = tk.Button(
+            control_frame,
+            text="Cancel",
+            command=self.cancel_parsing,
+            font=("Arial", 10),
+            width=8,
+            state='disabled'
+        )
+        self.cancel_btn.pack(side='left', padx=5)
+        
+        # Off by default: the results file is written afresh. On, files
+        # whose name is already in it are left out (CVs often share names)
+        self.skip_done = tk.BooleanVar(value=False)
+        self.skip_check = tk.Checkbutton(
+            self.root,
+            text=f"Skip CVs already in {RESULTS_FILE} (matched by file name)",
+            variable=self.skip_done,
+            font=("Arial", 10),
+            bg='#f0f0f0'
+        )
+        self.skip_check.pack(pady=(10, 0))
+        
+        # Status label
+        self.status_label = tk.Label(
+            self.root,
+            text="Ready to parse CVs",
+            font=("Arial", 10),
+            bg='#f0f0f0',
+            fg='#27ae60'
+        )
+        self.status_label.pack(pady=5)
+        
+        # Parse button
+        self.parse_btn = tk.Button(
+            self.root,
+            text="Parse CVs and Export to CSV",
+            command=self.parse_cvs,
+            font=("Arial", 14, "bold"),
+            bg='#27ae60',
+            fg='white',
+            relief='flat',
+            padx=30,
+            pady=15,
+            state='disabled'
+        )
+        self.parse_btn.pack(pady=20)
+        
+    def select_files(self):
+        files = filedialog.askopenfilenames(
+            title="Select PDF CV files",
+            filetypes=[("PDF files", "*.pdf"), ("All files", "*.*")]
+        )
+        if files:
+            self.selected_files = list(files)
+            self.update_files_display()
+            self.parse_btn.config(state='normal')
+            self.status_label.config(text=f"Selected {len(self.selected_files)} file(s)")
+            
+    def clear_files(self):
+        self.selected_files = []
+        self.files_listbox.delete(0, tk.END)
+        self.parse_btn.config(state='disabled')
+        self.status_label.config(text="Ready to parse CVs")
+        
+    def update_files_display(self):
+        self.files_listbox.delete(0, tk.END)
+        for file in self.selected_files:
+            filename = os.path.basename(file)
+            self.files_listbox.insert(tk.END, filename)
+            
+    def parse_cvs(self):
+        if not self.selected_files:
+            messagebox.showwarning("Warning", "Please select PDF files first!")
+            return
+        self.parse_btn.config(state='disabled')
+        self.select_btn.config(state='disabled')
+        self.clear_btn.config(state='disabled')
+        self.skip_check.config(state='disabled')
+        self.pause_btn.config(text="Pause", state='normal')
+        self.cancel_btn.config(state='normal')
+        self.progress.config(value=0)
+        thread = threading.Thread(target=self.process_cvs, args=(self.skip_done.get(),))
+        thread.daemon = True
+        thread.start()
+        
+    def toggle_pause(self):
+        if self.job is None:
+            return
+        if self.pause_btn.cget('text') == "Pause":
+            self.job.pause()
+            self.pause_btn.config(text="Resume")
+            self.status_label.config(text="Pausing after the files being parsed...")
+        else:
+            self.job.resume()
+            self.pause_btn.config(text="Pause")
+            
+    def cancel_parsing(self):
+        if self.job is not None:
+            self.job.cancel()
+            self.pause_btn.config(state='disabled')
+            self.cancel_btn.config(state='disabled')
+            self.status_label.config(text="Cancelling...")
+            
+    def show_progress(self, progress):
+        # Called from the parsing thread; the snapshot is handed to the Tk thread
+        self.root.after(0, self.update_progress, progress)
+        
+    def update_progress(self, progress):
+        self.progress.config(value=progress.fraction * 100)
+        if progress.state == jobs.PAUSED:
+            self.status_label.config(text=f"Paused at {progress.describe()}")
+        elif progress.state == jobs.RUNNING and progress.current:
+            self.status_label.config(
+                text=f"Processing {progress.describe()}: {os.path.basename(progress.current)}"
+            )
+            
+    def process_cvs(self, skip_done=False):
+        try:
+            with writers.open_writer(RESULTS_FILE, resume=skip_done) as writer:
+                pending = [pdf_path for pdf_path in self.selected_files
+                           if os.path.basename(pdf_path) not in writer.done]
+                skipped = len(self.selected_files) - len(pending)
+                self.job = jobs.ParseJob(pending, writer=writer, ordered=False, keep_results=False,
+                                         cache_path=cache.DEFAULT_CACHE_FILE, on_progress=self.show_progress,
+                                         ocr_options={} if ocr.is_available() else None)
+                for pdf_path, info, error, _ in self.job:
+                    if error:
+                        print(f"Error parsing {pdf_path}: {error}")
+            if self.job.cancelled:
+                title = "Cancelled"
+                message = f"Cancelled after {self.job.done} of {len(pending)} CV(s), {self.job.parsed} parsed"
+            else:
+                title = "Success"
+                message = f"Successfully processed {self.job.parsed} CV(s)"
+                self.root.after(0, self.progress.config, {'value': 100})
+            if skipped:
+                message += f" ({skipped} already in '{RESULTS_FILE}')"
+            self.root.after(0, self.status_label.config, {'text': message})
+            self.root.after(0, messagebox.showinfo, title, f"{message}\nResults saved to '{RESULTS_FILE}'")
+        except Exception as e:
+            self.root.after(0, messagebox.showerror, "Error", f"An error occurred: {e}")
+            self.root.after(0, self.status_label.config, {'text': "Error occurred during processing"})
+        finally:
+            self.job = None
+            for button in (self.parse_btn, self.select_btn, self.clear_btn, self.skip_check):
+                self.root.after(0, button.config, {'state': 'normal'})
+            for button in (self.pause_btn, self.cancel_btn):
+                self.root.after(0, button.config, {'state': 'disabled'})
+
+def main():
+    # Only checks that the PDF library is there; the workers import it
+    backend = backends.get_backend()
+    if not backends.is_available(backend.name):
+        messagebox.showerror("Missing Package", 
+                           f"{backend.module} is not installed. Please install it using:\npip install {backend.module}")
+        return
+    root = tk.Tk()
+    app = CVParser(root)
+    root.mainloop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+"""
+Cancellable, pausable parsing jobs with throttled progress reporting.
+
+    job = jobs.ParseJob(paths, writer=writer, on_progress=show, workers=4)
+    job.start()          # or job.run() to block, or iterate over job
+    job.pause(); job.resume(); job.cancel()
+
+Files are handed to the worker processes a few at a time rather than all
+at once, so pausing really stops new work (files already being parsed
+finish) and cancelling stops the workers straight away. Rows parsed before
+a cancel are kept in job.results and have already gone to the writer.
+job.results holds engine.CVRecord objects rather than the row dicts, as a
+large job can keep a great many of them; keep_results=False keeps none.
+
+With ocr_options set, files that come back without any text are read again by OCR
+(see ocr.py) in a second, smaller pool of processes, while the first pool
+carries on with the rest. In ordered mode such a file still comes out in
+its place, holding back only the rows after it.
+
+on_progress receives a JobProgress at most max_updates_per_second times a
+second, plus once whenever the job pauses, resumes or ends, so a GUI is
+never flooded with updates however fast files are parsed.
+"""
+
+import collections
+import queue
+import threading
+import time
+
+import cache
+import dedupe
+import engine
+import ocr
+import parallel
+
+READY = 'ready'
+RUNNING = 'running'
+PAUSED = 'paused'
+CANCELLED = 'cancelled'
+FINISHED = 'finished'
+FAILED = 'failed'
+
+# Upper bound on the automatic chunk size, so that pausing or cancelling
+# takes effect within a few files per worker
+MAX_CHUNKSIZE = 8
+
+
+class JobProgress:
+    """A snapshot of a job's progress."""
+
+    __slots__ = ('state', 'done', 'total', 'parsed', 'failed', 'elapsed', 'current', 'ocr_pending')
+
+    def __init__(self, state, done, total, parsed, failed, elapsed, current, ocr_pending=0):
+        self.state = state
+        self.done = done
+        self.total = total
+        self.parsed = parsed
+        self.failed = failed
+        self.elapsed = elapsed
+        # The file finished most recently
+        self.current = current
+        # Files waiting for or going through OCR
+        self.ocr_pending = ocr_pending
+
+    @property
+    def fraction(self):
+        return self.done / self.total if self.total else 1.0
+
+    @property
+    def rate(self):
+        """Files per second so far."""
+        return self.done / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def eta(self):
+        """Estimated seconds left, or None before the first file is done."""
+        if not self.done or not self.elapsed:
+            return None
+        return (self.total - self.done) / self.rate
+
+    def describe(self):
+        text = f"{self.done}/{self.total}"
+        if self.done:
+            text += f" ({self.rate:.1f} files/sec"
+            if self.done < self.total and self.state == RUNNING:
+                text += f", {format_seconds(self.eta)} left"
+            text += ")"
+        if self.ocr_pending:
+            text += f", {self.ocr_pending} in OCR"
+        return text
+
+
+def format_seconds(seconds):
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return f"{minutes}m{seconds:02d}s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m"
+
+
+class ParseJob:
+    """
+    Parse paths in worker processes, optionally writing each row to writer.
+
+    Iterating over the job yields (pdf_path, info, error, file_metrics) as
+    each file finishes: info is None when the file had no extractable text
+    or failed, error holds the reason, and file_metrics is a
+    metrics.FileMetrics when collect_metrics is true. run() does that to the
+    end and returns the rows.
+    ocr_options is None, or a dict of ocr.make_task options (languages, dpi,
+    page_timeout) to OCR files without text in ocr_workers processes.
+    duplicates is an optional dedupe.DuplicateIndex that sets the
+    candidate_id of each row before it is written or yielded.
+    Other keyword arguments are passed on to engine.parse_file.
+    """
+
+    def __init__(self, paths, writer=None, workers=None, chunksize=None, timeout=None, ordered=True,
+                 cache_path=None, cache_max_bytes=cache.DEFAULT_MAX_BYTES, collect_metrics=False,
+                 on_progress=None, max_updates_per_second=10, keep_results=True, ocr_options=None, ocr_workers=None,
+                 duplicates=None, **parse_options):
+        self.paths = list(paths)
+        self.writer = writer
+        self.workers = min(workers or parallel.default_workers(), max(len(self.paths), 1))
+        self.chunksize = chunksize or min(parallel.default_chunksize(len(self.paths), self.workers), MAX_CHUNKSIZE)
+        self.ordered = ordered
+        self.task_options = (timeout, cache_path, cache_max_bytes, collect_metrics, parse_options)
+        self.on_progress = on_progress
+        self.min_update_interval = 1.0 / max_updates_per_second if max_updates_per_second else 0.0
+        self.keep_results = keep_results
+        self.ocr_options = ocr_options
+        self.ocr_workers = ocr_workers or ocr.default_workers()
+        self.duplicates = duplicates
+        self.record_class = engine.CVRecord
+        if duplicates is not None:
+            parse_options['signature'] = True
+            self.record_class = dedupe.CandidateRecord
+        # Rows parsed so far; still there after a cancel
+        self.results = []
+        self.error = None
+        self.state = READY
+        self.done = 0
+        self.parsed = 0
+        self.failed = 0
+        self.current = None
+        self.ocr_pending = 0
+        # Seconds spent running before the current stretch, and when that began
+        self._run_time = 0.0
+        self._since = None
+        self._last_update = 0.0
+        self._cancel = threading.Event()
+        self._unpaused = threading.Event()
+        self._unpaused.set()
+        self._finished = threading.Event()
+        self._thread = None
+
+    # Control, safe to call from any thread
+
+    def pause(self):
+        if not self.cancelled:
+            self._unpaused.clear()
+
+    def resume(self):
+        self._unpaused.set()
+
+    def cancel(self):
+        self._cancel.set()
+        self._unpaused.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def start(self):
+        """Run the job in a background thread."""
+        self._thread = threading.Thread(target=self._run_quietly, daemon=True)
+        self._thread.start()
+        return self
+
+    def wait(self, timeout=None):
+        """Wait for a started job to end; returns False on timeout."""
+        return self._finished.wait(timeout)
+
+    def run(self):
+        """
+        Run the job in this thread and return the rows parsed (all of them
+        unless cancelled), as engine.CVRecord objects.
+        """
+        for _ in self:
+            pass
+        return self.results
+
+    def _run_quietly(self):
+        try:
+            self.run()
+        except Exception:
+            # Recorded in self.error and reported through on_progress
+            pass
+
+    def progress(self):
+        return JobProgress(self.state, self.done, len(self.paths), self.parsed, self.failed,
+                           self._elapsed(), self.current, self.ocr_pending)
+
+    # Running
+
+    def __iter__(self):
+        if self.state != READY:
+            raise RuntimeError("a job can only be run once")
+        self._set_state(RUNNING)
+        try:
+            for result in self._results():
+                self._record(result)
+                yield result
+        except (KeyboardInterrupt, GeneratorExit):
+            # Ctrl+C, or the caller stopped iterating; what was parsed is kept
+            self.cancel()
+            self._set_state(CANCELLED)
+            raise
+        except BaseException as e:
+            self.error = e
+            self._set_state(FAILED)
+            raise
+        else:
+            self._set_state(CANCELLED if self.cancelled else FINISHED)
+        finally:
+            _, cache_path, cache_max_bytes, _, _ = self.task_options
+            if cache_path:
+                cache.trim_cache(cache_path, cache_max_bytes)
+            self._finished.set()
+
+    def _record(self, result):
+        pdf_path, info, error, _ = result
+        self.done += 1
+        self.current = pdf_path
+        if info:
+            if self.duplicates is not None:
+                info[dedupe.CANDIDATE_FIELD] = self.duplicates.add(info)
+            if self.writer is not None:
+                self.writer.write(info)
+            if self.keep_results:
+                self.results.append(self.record_class.from_dict(info))
+            self.parsed += 1
+        else:
+            self.failed += 1
+        now = time.perf_counter()
+        if now - self._last_update >= self.min_update_interval:
+            self._report(now)
+
+    def _report(self, now=None):
+        self._last_update = now or time.perf_counter()
+        if self.on_progress is not None:
+            self.on_progress(self.progress())
+
+    def _set_state(self, state):
+        now = time.perf_counter()
+        if state == RUNNING:
+            if self._since is None:
+                self._since = now
+        elif self._since is not None:
+            self._run_time += now - self._since
+            self._since = None
+        self.state = state
+        self._report(now)
+
+    def _elapsed(self):
+        # Time spent running, not counting pauses
+        if self._since is None:
+            return self._run_time
+        return self._run_time + time.perf_counter() - self._since
+
+    def _pause_point(self, block):
+        """Follow pause/resume requests; with block, wait here while paused."""
+        if not self._unpaused.is_set() and self.state == RUNNING:
+            self._set_state(PAUSED)
+        if block:
+            self._unpaused.wait()
+        if self._unpaused.is_set() and self.state == PAUSED and not self.cancelled:
+            self._set_state(RUNNING)
+
+    def _tasks(self):
+        timeout, cache_path, cache_max_bytes, collect_metrics, parse_options = self.task_options
+        return [parallel.make_task(pdf_path, timeout, cache_path, cache_max_bytes, collect_metrics, parse_options)
+                for pdf_path in self.paths]
+
+    def _needs_ocr(self, result):
+        _, info, error, _ = result
+        # No text and no error: files refused as too large or not PDFs, or
+        # that could not be read, come back with an error
+        return self.ocr_options is not None and info is None and error is None
+
+    def _results(self):
+        tasks = self._tasks()
+        chunks = collections.deque(range(start, min(start + self.chunksize, len(tasks)))
+                                   for start in range(0, len(tasks), self.chunksize))
+        finished = queue.Queue()
+        # With a single worker, text is parsed right here (and multiprocessing
+        # is not even loaded unless OCR needs it)
+        if self.workers > 1 or self.ocr_options is not None:
+            import multiprocessing
+        text_pool = multiprocessing.Pool(self.workers) if self.workers > 1 else None
+        ocr_pool = multiprocessing.Pool(self.ocr_workers) if self.ocr_options is not None else None
+
+        def submit(pool, function, argument, key):
+            if pool is None:
+                finished.put((key, function(argument), None))
+            else:
+                pool.apply_async(function, (argument,), callback=lambda result: finished.put((key, result, None)),
+                                 error_callback=lambda e: finished.put((key, None, e)))
+
+        try:
+            # Keep every worker busy with one chunk queued behind it
+            window = self.workers * 2
+            in_flight = 0
+            next_index = 0
+            waiting = {}
+            while chunks or in_flight or self.ocr_pending:
+                # While paused, files already handed out still finish
+                self._pause_point(block=not (in_flight or self.ocr_pending))
+                while chunks and in_flight < window and self._unpaused.is_set() and not self.cancelled:
+                    chunk = chunks.popleft()
+                    in_flight += 1
+                    submit(text_pool, parallel.parse_tasks, [tasks[index] for index in chunk], ('text', chunk))
+                if self.cancelled:
+                    return
+                try:
+                    (kind, key), results, error = finished.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if error is not None:
+                    raise error
+                if kind == 'text':
+                    in_flight -= 1
+                    ready = []
+                    for index, result in zip(key, results):
+                        if self._needs_ocr(result):
+                            self.ocr_pending += 1
+                            task = ocr.make_task(tasks[index], file_metrics=result[3], **self.ocr_options)
+                            submit(ocr_pool, ocr.ocr_task, task, ('ocr', index))
+                        else:
+                            ready.append((index, result))
+                else:
+                    self.ocr_pending -= 1
+                    ready = [(key, results)]
+                if not self.ordered:
+                    for _, result in ready:
+                        yield result
+                    continue
+                waiting.update(ready)
+                while next_index in waiting:
+                    yield waiting.pop(next_index)
+                    next_index += 1
+        finally:
+            # Stops files still being parsed when cancelled
+            for pool in (text_pool, ocr_pool):
+                if pool is not None:
+                    pool.terminate()
+                    pool.join()
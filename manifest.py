@@ -0,0 +1,126 @@
+"""
+Manifest of the inputs behind a results file, for incremental runs.
+
+For every input PDF the manifest records its size, modification time,
+content hash and the result row it produced. The next run only parses files
+that are new or whose contents changed, drops rows for files that are gone,
+and rewrites the results file from the manifest. A file whose size and
+mtime are unchanged is trusted without being read; one that was only
+touched or copied is recognised by its hash.
+
+The manifest also records the extraction settings (rules version, PDF
+backend, page limits, gazetteer, OCR, duplicate detection), and starts over when they change.
+"""
+
+import json
+import os
+
+import cache
+import engine
+
+MANIFEST_VERSION = 1
+
+
+def default_manifest_path(output_path):
+    return output_path + '.manifest.json'
+
+
+def options_key(backend, max_pages=None, early_exit=False, gazetteer=None, max_file_size=None, ocr_options=None,
+                dedupe=False):
+    """Everything besides the file contents that decides what a row contains."""
+    options = {
+        'extractor': engine.EXTRACTOR_VERSION,
+        'backend': backend,
+        'max_pages': max_pages,
+        'early_exit': early_exit,
+        'gazetteer': gazetteer.fingerprint if gazetteer is not None else None,
+        'max_file_size': max_file_size,
+    }
+    # Only when on, so manifests from before these options existed stay valid
+    if ocr_options is not None:
+        options['ocr'] = ocr_options
+    if dedupe:
+        # Rows then carry the text signatures the duplicate index needs
+        options['dedupe'] = True
+    return json.dumps(options, sort_keys=True)
+
+
+class Manifest:
+    def __init__(self, path, options):
+        self.path = path
+        self.options = options
+        # Absolute path -> {'size', 'mtime_ns', 'hash', 'row'}; row is None
+        # for files that parsed without any extractable text
+        self.entries = {}
+        self.stale = False
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as file:
+                data = json.load(file)
+            if data.get('version') == MANIFEST_VERSION and data.get('options') == options:
+                self.entries = data['entries']
+            else:
+                self.stale = True
+
+    def plan(self, paths):
+        """
+        Split this run's inputs into (unchanged, to_parse, removed): the
+        paths whose recorded row still holds, the paths that need parsing,
+        and the recorded paths no longer among the inputs.
+        """
+        unchanged, to_parse = [], []
+        current = set()
+        for pdf_path in paths:
+            key = os.path.abspath(pdf_path)
+            current.add(key)
+            entry = self.entries.get(key)
+            try:
+                stat = os.stat(pdf_path)
+            except OSError:
+                to_parse.append(pdf_path)
+                continue
+            if entry is not None and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+                unchanged.append(pdf_path)
+            elif entry is not None and entry['size'] == stat.st_size and entry['hash'] == cache.file_hash(pdf_path):
+                # Touched or copied, same contents
+                entry['mtime_ns'] = stat.st_mtime_ns
+                unchanged.append(pdf_path)
+            else:
+                to_parse.append(pdf_path)
+        removed = [key for key in self.entries if key not in current]
+        for key in removed:
+            del self.entries[key]
+        return unchanged, to_parse, removed
+
+    def row(self, pdf_path):
+        return self.entries[os.path.abspath(pdf_path)]['row']
+
+    def record(self, pdf_path, info):
+        """
+        Remember the result of parsing pdf_path (info may be None for no
+        text). The file is only read again to hash it when info does not
+        carry its hash (see engine.parse_file(file_hash=True)).
+        """
+        content_hash = info.get(engine.HASH_KEY) if info else None
+        try:
+            stat = os.stat(pdf_path)
+            if content_hash is None:
+                content_hash = cache.file_hash(pdf_path)
+        except OSError:
+            return
+        if info:
+            info = {key: value for key, value in info.items() if key != engine.HASH_KEY}
+        self.entries[os.path.abspath(pdf_path)] = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'hash': content_hash,
+            'row': info,
+        }
+
+    def forget(self, pdf_path):
+        self.entries.pop(os.path.abspath(pdf_path), None)
+
+    def save(self):
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump({'version': MANIFEST_VERSION, 'options': self.options, 'entries': self.entries}, file)
+        os.replace(temp_path, self.path)
@@ -0,0 +1,129 @@
+"""
+Opt-in per-file instrumentation.
+
+A FileMetrics record is only created when metrics are requested; everywhere
+else the engine sees metrics=None and skips timing altogether, so a normal
+run pays a handful of `is not None` checks per file.
+"""
+
+import json
+import time
+
+STAGES = ('hash', 'cache', 'pdf_text', 'fields', 'ocr', 'write')
+
+
+class FileMetrics:
+    __slots__ = ('path', 'status', 'error', 'stages', 'pages', 'text_length', 'cache_hit', 'matched', 'ocr_pages')
+
+    def __init__(self, path):
+        self.path = path
+        self.status = 'ok'
+        self.error = None
+        self.stages = {}
+        self.pages = 0
+        self.text_length = 0
+        self.cache_hit = False
+        # Field name -> which pattern produced it, e.g. {'Phone': 'phone[3]'}
+        self.matched = {}
+        # (page number, seconds, 'ok' / 'cached' / 'timeout') per page read by OCR
+        self.ocr_pages = []
+
+    def add_stage(self, stage, seconds):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def add_ocr_page(self, page_number, seconds, status):
+        self.ocr_pages.append((page_number, seconds, status))
+        self.add_stage('ocr', seconds)
+
+    def fail(self, status, error):
+        self.status = status
+        self.error = str(error)
+
+    def counted(self, pages):
+        """Wrap a page iterator so the pages actually read are counted."""
+        for page_text in pages:
+            self.pages += 1
+            yield page_text
+
+    def as_dict(self):
+        return {
+            'path': self.path,
+            'status': self.status,
+            'error': self.error,
+            'stages_ms': {stage: round(seconds * 1000, 3) for stage, seconds in self.stages.items()},
+            'pages': self.pages,
+            'text_length': self.text_length,
+            'cache_hit': self.cache_hit,
+            'matched': self.matched,
+            'ocr_pages': [{'page': page_number, 'ms': round(seconds * 1000, 3), 'status': status}
+                          for page_number, seconds, status in self.ocr_pages],
+        }
+
+
+class MetricsSummary:
+    """Run-level totals built from FileMetrics records, plus the JSONL sidecar."""
+
+    def __init__(self, sidecar_path=None):
+        self.files = 0
+        self.by_status = {}
+        self.stage_times = {}
+        self.pages = 0
+        self.text_length = 0
+        self.cache_hits = 0
+        self.matched = {}
+        self.ocr_pages = {}
+        self.failures = []
+        self.started = time.perf_counter()
+        self.sidecar = open(sidecar_path, 'w', encoding='utf-8') if sidecar_path else None
+
+    def add(self, metrics):
+        self.files += 1
+        self.by_status[metrics.status] = self.by_status.get(metrics.status, 0) + 1
+        for stage, seconds in metrics.stages.items():
+            self.stage_times.setdefault(stage, []).append(seconds)
+        self.pages += metrics.pages
+        self.text_length += metrics.text_length
+        self.cache_hits += metrics.cache_hit
+        for field, pattern in metrics.matched.items():
+            counts = self.matched.setdefault(field, {})
+            counts[pattern] = counts.get(pattern, 0) + 1
+        for _, seconds, status in metrics.ocr_pages:
+            self.ocr_pages.setdefault(status, []).append(seconds)
+        if metrics.status != 'ok':
+            self.failures.append((metrics.path, metrics.status, metrics.error))
+        if self.sidecar is not None:
+            self.sidecar.write(json.dumps(metrics.as_dict()) + '\n')
+
+    def close(self):
+        if self.sidecar is not None:
+            self.sidecar.close()
+
+    def report(self, max_failures=10):
+        elapsed = time.perf_counter() - self.started
+        rate = self.files / elapsed if elapsed else 0.0
+        lines = [f"Metrics: {self.files} file(s) in {elapsed:.2f}s ({rate:.1f} files/sec), "
+                 f"{self.pages} page(s), {self.cache_hits} cache hit(s)"]
+        lines.append("  status: " + ', '.join(f"{status}={count}" for status, count in sorted(self.by_status.items())))
+        for stage in STAGES:
+            times = sorted(self.stage_times.get(stage, []))
+            if times:
+                p95 = times[min(len(times) - 1, int(len(times) * 0.95))]
+                lines.append(f"  {stage:<9} total {sum(times):8.3f}s  mean {sum(times) / len(times) * 1000:8.2f}ms  "
+                             f"p95 {p95 * 1000:8.2f}ms")
+        if self.ocr_pages:
+            times = sorted(seconds for status in ('ok', 'timeout') for seconds in self.ocr_pages.get(status, []))
+            line = (f"  OCR: {sum(map(len, self.ocr_pages.values()))} page(s), "
+                    f"{len(self.ocr_pages.get('cached', []))} from cache, "
+                    f"{len(self.ocr_pages.get('timeout', []))} timed out")
+            if times:
+                p95 = times[min(len(times) - 1, int(len(times) * 0.95))]
+                line += f", {sum(times) / len(times) * 1000:.0f}ms per page read (p95 {p95 * 1000:.0f}ms)"
+            lines.append(line)
+        for field, counts in sorted(self.matched.items()):
+            lines.append(f"  {field:<10} " + ', '.join(f"{pattern}={count}" for pattern, count in
+                                                       sorted(counts.items(), key=lambda item: -item[1])))
+        for path, status, error in self.failures[:max_failures]:
+            lines.append(f"  {status}: {path}: {error}")
+        if len(self.failures) > max_failures:
+            lines.append(f"  ... and {len(self.failures) - max_failures} more failure(s)")
+        return '\n'.join(lines)
@@ -0,0 +1,180 @@
+"""
+OCR fallback for scanned CVs.
+
+A CV that was scanned rather than typed has no text layer, so every PDF
+backend returns nothing for it. With OCR turned on (cv_parser.py --ocr),
+files that come back without any text are handed to a separate, smaller
+pool of worker processes (see jobs.ParseJob). It renders the pages that
+have no text layer with pypdfium2 and reads them with the Tesseract
+command-line program, so files with text never wait behind a slow scan.
+
+OCR text is stored in the result cache under the hash of the rendered page
+image, so a page seen before, in any file, is not read again. Per-page
+timings go to the file's metrics.
+
+Needs the tesseract program on PATH (or named by CV_PARSER_TESSERACT) and
+pypdfium2 (pip install pypdfium2).
+"""
+
+import hashlib
+import os
+import sys
+import time
+
+import backends
+import cache
+import engine
+
+ENV_VARIABLE = 'CV_PARSER_TESSERACT'
+DEFAULT_LANGUAGES = 'eng'
+DEFAULT_DPI = 300
+
+
+def tesseract_command():
+    import shutil
+    return os.environ.get(ENV_VARIABLE) or shutil.which('tesseract')
+
+
+def is_available():
+    return bool(tesseract_command()) and backends.is_available('pdfium')
+
+
+def default_workers():
+    # OCR is slow enough that a few processes keep up with the scanned share
+    # of a batch, and leaves the other cores to the text path
+    return max(1, (os.cpu_count() or 1) // 4)
+
+
+def make_task(text_task, languages=DEFAULT_LANGUAGES, dpi=DEFAULT_DPI, page_timeout=None, file_metrics=None):
+    """An OCR task for a parallel.make_task() tuple whose file had no text."""
+    return (text_task, languages, dpi, page_timeout, file_metrics)
+
+
+def ocr_task(task):
+    """Run a make_task() tuple, returning (pdf_path, info, error, file_metrics) like parallel.parse_task."""
+    text_task, languages, dpi, page_timeout, file_metrics = task
+    pdf_path, _, cache_path, cache_max_bytes, _, parse_options = text_task
+    options = {key: value for key, value in parse_options.items() if key != 'backend'}
+    if file_metrics is not None:
+        # Picks up where the text path left off
+        file_metrics.status, file_metrics.error = 'ok', None
+    try:
+        result_cache = cache.open_cache(cache_path, cache_max_bytes) if cache_path else None
+        info = ocr_file(pdf_path, result_cache, languages, dpi, page_timeout, metrics=file_metrics, **options)
+        return pdf_path, info, None, file_metrics
+    except backends.RejectedFile as e:
+        if file_metrics is not None:
+            file_metrics.fail('rejected', e)
+        return pdf_path, None, str(e), file_metrics
+    except Exception as e:
+        if file_metrics is not None:
+            file_metrics.fail('error', e)
+        return pdf_path, None, str(e), file_metrics
+
+
+def ocr_file(pdf_path, cache=None, languages=DEFAULT_LANGUAGES, dpi=DEFAULT_DPI, page_timeout=None,
+             max_pages=None, early_exit=False, gazetteer=None, metrics=None, max_file_size=None, signature=False,
+             file_hash=False):
+    """
+    Parse one PDF by OCR of its pages without a text layer, returning a
+    result row or None like engine.parse_file. Pages with a text layer are
+    read as they are. Pages are read lazily, so max_pages and early_exit
+    also limit how many pages go through OCR. signature and file_hash are as
+    for engine.parse_file.
+    """
+    trace = metrics.matched if metrics is not None else None
+    with backends.MappedPdf(pdf_path, max_file_size) as data:
+        pages = iter_page_texts(data, cache, languages, dpi, page_timeout, metrics, pdf_path)
+        try:
+            text, info = engine.extract_information_from_pages(pages, max_pages, early_exit, gazetteer, trace)
+        finally:
+            pages.close()
+        digest = hashlib.sha256(data).hexdigest() if file_hash and info else None
+    if metrics is not None:
+        metrics.text_length = len(text)
+    if not info:
+        if metrics is not None:
+            metrics.fail('no_text', "no text found by OCR")
+        return None
+    info['Filename'] = os.path.basename(pdf_path)
+    if file_hash:
+        info[engine.HASH_KEY] = digest
+    if signature:
+        engine.add_signature(info, text)
+    return info
+
+
+def iter_page_texts(data, cache=None, languages=DEFAULT_LANGUAGES, dpi=DEFAULT_DPI, page_timeout=None,
+                    metrics=None, pdf_path=None):
+    """Yield the text of each page of a mapped PDF, by OCR where it has no text layer."""
+    import ctypes
+    import pypdfium2
+    pdf = pypdfium2.PdfDocument((ctypes.c_char * len(data)).from_buffer(data))
+    try:
+        for index in range(len(pdf)):
+            page = pdf[index]
+            try:
+                textpage = page.get_textpage()
+                try:
+                    text = textpage.get_text_range().replace('\r\n', '\n') if textpage.count_chars() else ''
+                finally:
+                    textpage.close()
+                if not text.strip():
+                    text = _read_page(page, index + 1, cache, languages, dpi, page_timeout, metrics, pdf_path)
+            finally:
+                page.close()
+            yield text
+    finally:
+        pdf.close()
+
+
+def _read_page(page, page_number, cache, languages, dpi, page_timeout, metrics, pdf_path):
+    import subprocess
+    started = time.perf_counter()
+    image = render_page(page, dpi)
+    page_hash = f'{hashlib.sha256(image).hexdigest()}:{languages}'
+    text = cache.get_page_text(page_hash) if cache is not None else None
+    status = 'cached'
+    if text is None:
+        try:
+            text = run_tesseract(image, languages, dpi, page_timeout)
+            status = 'ok'
+        except subprocess.TimeoutExpired:
+            text, status = '', 'timeout'
+            if metrics is None:
+                print(f"OCR of page {page_number} of {pdf_path} timed out after {page_timeout}s",
+                      file=sys.stderr)
+        else:
+            if cache is not None:
+                cache.put_page_text(page_hash, text)
+    if metrics is not None:
+        metrics.add_ocr_page(page_number, time.perf_counter() - started, status)
+    return text
+
+
+def render_page(page, dpi=DEFAULT_DPI):
+    """Render a pypdfium2 page as a greyscale PGM image."""
+    bitmap = page.render(scale=dpi / 72, grayscale=True)
+    try:
+        width, height, stride = bitmap.width, bitmap.height, bitmap.stride
+        pixels = memoryview(bitmap.buffer).cast('B')
+        if stride != width:
+            pixels = b''.join(pixels[row * stride:row * stride + width] for row in range(height))
+        return b'P5\n%d %d\n255\n' % (width, height) + bytes(pixels)
+    finally:
+        bitmap.close()
+
+
+def run_tesseract(image, languages=DEFAULT_LANGUAGES, dpi=DEFAULT_DPI, timeout=None):
+    """OCR an image with the tesseract program; raises subprocess.TimeoutExpired after timeout seconds."""
+    import subprocess
+    command = tesseract_command()
+    if not command:
+        raise RuntimeError("OCR needs the tesseract program, see https://github.com/tesseract-ocr/tesseract")
+    # One thread per process: the OCR pool already runs several at once
+    env = dict(os.environ, OMP_THREAD_LIMIT='1')
+    result = subprocess.run([command, 'stdin', 'stdout', '-l', languages, '--dpi', str(dpi)],
+                            input=image, capture_output=True, timeout=timeout, env=env)
+    if result.returncode != 0:
+        raise RuntimeError(f"tesseract failed: {result.stderr.decode('utf-8', 'replace').strip()}")
+    return result.stdout.decode('utf-8', 'replace').replace('\x0c', '')
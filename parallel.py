@@ -0,0 +1,93 @@
+"""
+Multi-process parsing pool.
+
+PyPDF2 text extraction is pure Python and CPU-bound, so a batch of CVs only
+scales with the number of cores when each file is parsed in its own process.
+"""
+
+import importlib
+import os
+import signal
+import sys
+import threading
+
+import backends
+import cache
+import engine
+import metrics
+
+
+class ParseTimeout(BaseException):
+    # Not an Exception subclass, so the broad error handling inside the
+    # engine cannot swallow it.
+    pass
+
+
+def _raise_timeout(signum, frame):
+    raise ParseTimeout()
+
+
+def make_task(pdf_path, timeout=None, cache_path=None, cache_max_bytes=cache.DEFAULT_MAX_BYTES,
+              collect_metrics=False, parse_options=None):
+    # A plain tuple, so it pickles cheaply to worker processes
+    return (pdf_path, timeout, cache_path, cache_max_bytes, collect_metrics, parse_options or {})
+
+
+def parse_task(task):
+    """Parse the file described by a make_task() tuple, in whatever process runs it."""
+    pdf_path, timeout, cache_path, cache_max_bytes, collect_metrics, parse_options = task
+    file_metrics = metrics.FileMetrics(pdf_path) if collect_metrics else None
+    # Per-file timeouts rely on SIGALRM, which is only available on POSIX and
+    # only from the main thread of a process.
+    use_alarm = (timeout and hasattr(signal, 'setitimer')
+                 and threading.current_thread() is threading.main_thread())
+    if use_alarm:
+        previous_handler = signal.signal(signal.SIGALRM, _raise_timeout)
+    try:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+        result_cache = cache.open_cache(cache_path, cache_max_bytes) if cache_path else None
+        # Files refused or unreadable are reported here, not in the worker
+        errors = []
+        info = engine.parse_file(pdf_path, result_cache, metrics=file_metrics, on_error=errors.append,
+                                 **parse_options)
+        return pdf_path, info, str(errors[0]) if errors else None, file_metrics
+    except ParseTimeout:
+        error = f"timed out after {timeout}s"
+        if file_metrics is not None:
+            file_metrics.fail('timeout', error)
+        return pdf_path, None, error, file_metrics
+    except Exception as e:
+        if file_metrics is not None:
+            file_metrics.fail('error', e)
+        return pdf_path, None, str(e), file_metrics
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous_handler)
+
+
+def warm_up(backend=None, stdout_to_stderr=False):
+    """
+    Pool initializer for long-lived workers: import the PDF library now
+    rather than on the first file. stdout_to_stderr keeps the engine's
+    messages off a stdout that carries results.
+    """
+    if stdout_to_stderr:
+        sys.stdout = sys.stderr
+    importlib.import_module(backends.get_backend(backend).module)
+
+
+def parse_tasks(tasks):
+    """parse_task over a list of tasks, to hand several files to a worker at once."""
+    return [parse_task(task) for task in tasks]
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def default_chunksize(total, workers):
+    # Same heuristic as multiprocessing.Pool.map: about four chunks per worker.
+    chunksize, extra = divmod(total, workers * 4)
+    return chunksize + 1 if extra else max(chunksize, 1)
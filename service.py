@@ -0,0 +1,364 @@
+"""
+Long-running ingestion service.
+
+    python service.py --inbox incoming -o results.jsonl
+    python service.py --socket /tmp/cv-parser.sock -o results.jsonl
+    python service.py --inbox incoming --port 8765 -o results.csv
+    python service.py --stdio
+
+CVs arrive either by being dropped into an inbox folder, or as file paths
+sent one per line to a local TCP port or Unix socket. Each connection gets
+one JSON line back per path with the extracted fields (or an error). With
+--stdio the same exchange runs over stdin and stdout, so a pipeline can keep
+one service process open instead of starting Python for every file; the
+service stops when stdin is closed.
+
+Worker processes are started and have the PDF library loaded before the
+first file arrives, and stay up, so each request only pays for parsing.
+
+Work flows through a bounded queue into a pool of worker processes. When
+every worker is busy and the queue is full, the inbox scanner stops picking
+up files and socket connections stop being read, so a burst of uploads
+waits on disk or in the client instead of piling up in memory. Each result
+is written as soon as it is ready.
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import contextlib
+import json
+import os
+import shutil
+import sys
+import threading
+
+import backends
+import cache
+import parallel
+import writers
+
+PROCESSED_DIR = 'processed'
+FAILED_DIR = 'failed'
+# Parquet and Arrow files only become readable once closed, which a service
+# that runs until stopped never is
+OUTPUT_FORMATS = ('csv', 'jsonl')
+
+
+class IngestionService:
+    def __init__(self, writer=None, workers=None, queue_size=None, timeout=None,
+                 cache_path=None, parse_options=None, quiet=False):
+        self.writer = writer
+        self.workers = workers or parallel.default_workers()
+        # Enough queued work to keep every worker busy between scans
+        self.queue_size = queue_size or self.workers * 2
+        self.timeout = timeout
+        self.cache_path = cache_path
+        self.parse_options = parse_options or {}
+        self.quiet = quiet
+        self.queue = None
+        self.pool = None
+        self.stdio = False
+        self.parsed = 0
+        self.failed = 0
+
+    def log(self, message):
+        if not self.quiet:
+            print(message, file=sys.stderr)
+
+    async def submit(self, pdf_path):
+        """
+        Queue a file and return a future for its (pdf_path, info, error) result.
+        Waits while the queue is full, which is what applies backpressure.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((pdf_path, future))
+        return future
+
+    def _new_pool(self, workers):
+        return concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, initializer=parallel.warm_up,
+            initargs=(self.parse_options.get('backend'), self.stdio)
+        )
+
+    async def start_pool(self):
+        """(Re)start the worker processes, with the PDF library loaded before the first file."""
+        loop = asyncio.get_running_loop()
+        self.pool = self._new_pool(self.workers)
+        await asyncio.gather(*(loop.run_in_executor(self.pool, int) for _ in range(self.workers)))
+
+    async def _parse(self, task):
+        # A worker that dies (say, a crash inside a PDF library) breaks the
+        # whole pool, losing every file in flight: start a new pool and give
+        # the file one more try. The retry runs in a process of its own, so
+        # if this is the file that crashes it takes no other file down again.
+        loop = asyncio.get_running_loop()
+        pool = self.pool
+        try:
+            return await loop.run_in_executor(pool, parallel.parse_task, task)
+        except concurrent.futures.process.BrokenProcessPool:
+            if pool is self.pool:
+                self.log("A worker process died, restarting the workers")
+                pool.shutdown(wait=False)
+                await self.start_pool()
+        alone = self._new_pool(1)
+        try:
+            return await loop.run_in_executor(alone, parallel.parse_task, task)
+        except concurrent.futures.process.BrokenProcessPool:
+            return task[0], None, "worker process died while parsing", None
+        finally:
+            alone.shutdown(wait=False)
+
+    async def _worker(self):
+        while True:
+            pdf_path, future = await self.queue.get()
+            try:
+                task = parallel.make_task(pdf_path, self.timeout, self.cache_path,
+                                          parse_options=self.parse_options)
+                pdf_path, info, error, _ = await self._parse(task)
+            except Exception as e:
+                info, error = None, str(e)
+            finally:
+                self.queue.task_done()
+            self._emit(pdf_path, info, error)
+            if not future.done():
+                future.set_result((pdf_path, info, error))
+
+    def _emit(self, pdf_path, info, error):
+        if info:
+            if self.writer is not None:
+                self.writer.write(info)
+                # Results should be visible to downstream readers right away
+                self.writer.flush()
+            self.parsed += 1
+            self.log(f"Parsed {pdf_path}")
+        else:
+            self.failed += 1
+            self.log(f"Failed {pdf_path}: {error or 'no extractable text'}")
+
+    async def watch_inbox(self, inbox, poll_interval=1.0, keep=False):
+        """
+        Pick up PDFs dropped into inbox. A file is only taken once its size
+        has stopped changing between two scans, so half-copied uploads are
+        left alone. Finished files move to inbox/processed or inbox/failed
+        unless keep is set.
+        """
+        for name in (PROCESSED_DIR, FAILED_DIR):
+            os.makedirs(os.path.join(inbox, name), exist_ok=True)
+        sizes = {}
+        taken = set()
+        while True:
+            seen = {}
+            for entry in os.scandir(inbox):
+                if not entry.is_file() or not entry.name.lower().endswith('.pdf') or entry.path in taken:
+                    continue
+                size = entry.stat().st_size
+                seen[entry.path] = size
+                if sizes.get(entry.path) == size:
+                    taken.add(entry.path)
+                    future = await self.submit(entry.path)
+                    if not keep:
+                        future.add_done_callback(lambda done, path=entry.path: self._file_away(inbox, path, done, taken))
+            sizes = seen
+            await asyncio.sleep(poll_interval)
+
+    def _file_away(self, inbox, pdf_path, future, taken):
+        _, info, _ = future.result()
+        target = _unused_path(os.path.join(inbox, PROCESSED_DIR if info else FAILED_DIR, os.path.basename(pdf_path)))
+        try:
+            shutil.move(pdf_path, target)
+        except OSError as e:
+            self.log(f"Could not move {pdf_path}: {e}")
+        taken.discard(pdf_path)
+
+    async def handle_connection(self, reader, writer):
+        """One file path per line in, one JSON result per line out, in the same order."""
+        pending = asyncio.Queue()
+
+        async def reply():
+            while True:
+                future = await pending.get()
+                if future is None:
+                    break
+                pdf_path, info, error = await future
+                response = {'path': pdf_path, 'ok': bool(info), 'result': info, 'error': error}
+                writer.write((json.dumps(response) + '\n').encode('utf-8'))
+                await writer.drain()
+
+        replier = asyncio.create_task(reply())
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                pdf_path = line.decode('utf-8').strip()
+                if pdf_path:
+                    # Not reading the next line until there is room in the
+                    # queue pushes back on the client.
+                    await pending.put(await self.submit(pdf_path))
+        finally:
+            await pending.put(None)
+            await replier
+            writer.close()
+
+    async def run(self, inbox=None, poll_interval=1.0, keep=False, host='127.0.0.1', port=None,
+                  socket_path=None, stdio=False):
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self.stdio = stdio
+        # Start every worker now rather than on the first requests
+        await self.start_pool()
+        tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        servers = []
+        try:
+            if stdio:
+                connection = asyncio.create_task(self.handle_connection(StdinReader(), StdoutWriter()))
+                if inbox is None and port is None and socket_path is None:
+                    # Nothing else to serve: stop once the other end closes stdin
+                    await connection
+                    return
+                tasks.append(connection)
+            if port is not None:
+                servers.append(await asyncio.start_server(self.handle_connection, host, port))
+                self.log(f"Listening on {host}:{port}")
+            if socket_path is not None:
+                servers.append(await asyncio.start_unix_server(self.handle_connection, socket_path))
+                self.log(f"Listening on {socket_path}")
+            if inbox is not None:
+                self.log(f"Watching {inbox}")
+                tasks.append(asyncio.create_task(self.watch_inbox(inbox, poll_interval, keep)))
+            await asyncio.gather(*tasks)
+        finally:
+            for server in servers:
+                server.close()
+            for task in tasks:
+                task.cancel()
+            self.pool.shutdown(cancel_futures=True)
+            if self.cache_path:
+                cache.trim_cache(self.cache_path)
+
+
+def _unused_path(path):
+    # A second upload with the same name must not overwrite the first: CV.pdf, CV-1.pdf, ...
+    stem, extension = os.path.splitext(path)
+    number = 0
+    while os.path.exists(path):
+        number += 1
+        path = f"{stem}-{number}{extension}"
+    return path
+
+
+class StdinReader:
+    """
+    The readline() of an asyncio stream, over stdin. Lines are read by a
+    daemon thread, which works whatever stdin is (pipe, file or console)
+    and does not hold up shutdown while it waits for input.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.lines = asyncio.Queue()
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self):
+        try:
+            for line in iter(sys.stdin.buffer.readline, b''):
+                self.loop.call_soon_threadsafe(self.lines.put_nowait, line)
+            self.loop.call_soon_threadsafe(self.lines.put_nowait, b'')
+        except RuntimeError:
+            # The service stopped first
+            pass
+
+    async def readline(self):
+        return await self.lines.get()
+
+
+class StdoutWriter:
+    """The write/drain/close of an asyncio stream, over stdout."""
+
+    def write(self, data):
+        sys.stdout.buffer.write(data)
+
+    async def drain(self):
+        sys.stdout.buffer.flush()
+
+    def close(self):
+        sys.stdout.buffer.flush()
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(
+        prog='cv-parser-service',
+        description="Parse CVs continuously as they arrive in an inbox folder or over a local socket."
+    )
+    parser.add_argument('--inbox', metavar='DIR', help="folder to watch for new PDF files")
+    parser.add_argument('--poll-interval', type=float, default=1.0, metavar='SECONDS',
+                        help="how often to scan the inbox (default: 1)")
+    parser.add_argument('--keep', action='store_true',
+                        help="leave parsed files in the inbox instead of moving them to processed/ or failed/")
+    parser.add_argument('--port', type=int, default=None, help="accept file paths on this local TCP port")
+    parser.add_argument('--host', default='127.0.0.1', help="address for --port (default: 127.0.0.1)")
+    parser.add_argument('--socket', metavar='PATH', default=None, help="accept file paths on this Unix socket")
+    parser.add_argument('--stdio', action='store_true',
+                        help="accept file paths on stdin and answer on stdout, until stdin is closed")
+    parser.add_argument('-o', '--output', default=None,
+                        help="results file, appended to (.csv or .jsonl); needed with --inbox")
+    parser.add_argument('-f', '--format', choices=OUTPUT_FORMATS, default=None)
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="number of worker processes (default: one per CPU core)")
+    parser.add_argument('--queue-size', type=int, default=None,
+                        help="files waiting for a worker before intake pauses (default: twice the workers)")
+    parser.add_argument('--timeout', type=float, default=None,
+                        help="give up on a single file after this many seconds")
+    parser.add_argument('--pdf-backend', default=None, choices=['auto'] + list(backends.BACKENDS),
+                        help="PDF text extractor, see cv_parser.py --help")
+    parser.add_argument('--max-file-size', metavar='MB', type=float, default=None,
+                        help="skip files larger than this without parsing them")
+    parser.add_argument('--cache', metavar='FILE', default=None, help="result cache file")
+    parser.add_argument('-q', '--quiet', action='store_true', help="do not log each file on stderr")
+    return parser
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    if not (args.inbox or args.port or args.socket or args.stdio):
+        print("cv-parser-service: give at least one of --inbox, --port, --socket or --stdio", file=sys.stderr)
+        return 2
+    if args.inbox and not args.output:
+        print("cv-parser-service: --inbox needs a results file (-o)", file=sys.stderr)
+        return 2
+    if args.stdio and args.output == '-':
+        print("cv-parser-service: stdout carries the replies with --stdio, write results to a file", file=sys.stderr)
+        return 2
+    if args.output and (args.format or writers.format_for_path(args.output)) not in OUTPUT_FORMATS:
+        print("cv-parser-service: results are appended as they arrive, write them to a .csv or .jsonl file",
+              file=sys.stderr)
+        return 2
+    try:
+        pdf_backend = backends.get_backend(args.pdf_backend)
+    except ValueError as e:
+        print(f"cv-parser-service: {e}", file=sys.stderr)
+        return 2
+    if not backends.is_available(pdf_backend.name):
+        print(f"cv-parser-service: the {pdf_backend.name} PDF backend needs the {pdf_backend.module} package",
+              file=sys.stderr)
+        return 2
+    parse_options = {'backend': pdf_backend.name}
+    if args.max_file_size is not None:
+        parse_options['max_file_size'] = int(args.max_file_size * 1024 * 1024)
+    output = writers.open_writer(args.output, args.format, resume=True) if args.output else contextlib.nullcontext()
+    with output as writer:
+        service = IngestionService(writer, workers=args.workers, queue_size=args.queue_size,
+                                   timeout=args.timeout, cache_path=args.cache,
+                                   parse_options=parse_options, quiet=args.quiet)
+        try:
+            asyncio.run(service.run(inbox=args.inbox, poll_interval=args.poll_interval, keep=args.keep,
+                                    host=args.host, port=args.port, socket_path=args.socket,
+                                    stdio=args.stdio))
+        except KeyboardInterrupt:
+            pass
+    print(f"Stopped: {service.parsed} CV(s) parsed, {service.failed} failed", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+Tests for choosing a PDF backend, the checks made before a PDF is read, and
+reading PDFs with each backend.
+"""
+
+import os
+
+import pytest
+
+import backends
+import benchmark
+import engine
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    path = str(tmp_path / 'cv.pdf')
+    benchmark.write_pdf(path, benchmark.make_cv_pages(2))
+    return path
+
+
+def test_default_and_environment(monkeypatch):
+    monkeypatch.delenv(backends.ENV_VARIABLE, raising=False)
+    assert backends.get_backend().name == backends.DEFAULT_BACKEND
+    monkeypatch.setenv(backends.ENV_VARIABLE, 'PDFminer')
+    assert backends.get_backend().name == 'pdfminer'
+    # A name given explicitly wins over the environment
+    assert backends.get_backend('pypdf2').name == 'pypdf2'
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError, match='unknown PDF backend'):
+        backends.get_backend('acrobat')
+
+
+def test_auto_picks_the_fastest_installed(monkeypatch):
+    monkeypatch.setattr(backends, '_auto_backend', None)
+    monkeypatch.setattr(backends, 'is_available', lambda name: name != 'pdfium')
+    assert backends.get_backend('auto').name == 'pypdf2'
+    # The choice is remembered
+    monkeypatch.setattr(backends, 'is_available', lambda name: True)
+    assert backends.get_backend('auto').name == 'pypdf2'
+    monkeypatch.setattr(backends, '_auto_backend', None)
+    assert backends.get_backend('auto').name == 'pdfium'
+
+
+def test_auto_without_any_backend(monkeypatch):
+    monkeypatch.setattr(backends, '_auto_backend', None)
+    monkeypatch.setattr(backends, 'is_available', lambda name: False)
+    with pytest.raises(ValueError, match='no PDF backend'):
+        backends.get_backend('auto')
+
+
+@pytest.mark.parametrize('name', list(backends.BACKENDS))
+def test_every_backend_reads_the_same_fields(pdf_path, name):
+    if not backends.is_available(name):
+        pytest.skip(f"{backends.BACKENDS[name].module} is not installed")
+    expected = engine.parse_file(pdf_path, backend='pypdf2')
+    info = engine.parse_file(pdf_path, backend=name)
+    for field in ('Name', 'Email', 'Phone'):
+        assert info[field] == expected[field]
+    pages = list(backends.get_backend(name).iter_pages(pdf_path))
+    assert len(pages) == 2
+    with backends.MappedPdf(pdf_path) as data:
+        assert list(backends.get_backend(name).iter_pages(data)) == pages
+
+
+def test_mapped_pdf_size_limit(pdf_path):
+    size = os.path.getsize(pdf_path)
+    with backends.MappedPdf(pdf_path, max_bytes=size) as data:
+        assert len(data) == size
+    with pytest.raises(backends.RejectedFile, match='over the'):
+        backends.MappedPdf(pdf_path, max_bytes=size - 1)
+    errors = []
+    assert engine.parse_file(pdf_path, max_file_size=size - 1, on_error=errors.append) is None
+    assert isinstance(errors[0], backends.RejectedFile)
+
+
+@pytest.mark.parametrize('contents', [b'', b'<html>not a pdf</html>', b' ' * backends.MAGIC_WINDOW + b'%PDF-1.4'])
+def test_mapped_pdf_rejects_files_without_the_pdf_header(tmp_path, contents):
+    path = tmp_path / 'upload.pdf'
+    path.write_bytes(contents)
+    with pytest.raises(backends.RejectedFile, match='not a PDF file'):
+        backends.MappedPdf(str(path))
+
+
+def test_mapped_pdf_accepts_junk_before_the_header(tmp_path, pdf_path):
+    # Some generators write a few bytes before %PDF-, which readers accept
+    path = tmp_path / 'prefixed.pdf'
+    with open(pdf_path, 'rb') as file:
+        path.write_bytes(b'\r\n' + file.read())
+    with backends.MappedPdf(str(path)) as data:
+        assert data[:2] == b'\r\n'
+    assert engine.parse_file(str(path))['Email'] == engine.parse_file(pdf_path)['Email']
@@ -0,0 +1,79 @@
+"""
+Tests for batch extraction: every text must come out exactly as
+engine.extract_information would extract it on its own.
+"""
+
+import pytest
+
+import batch
+import benchmark
+import cache
+import engine
+
+TEXTS = [
+    '',
+    'Jane Doe\nno contact details at all',
+    # A match must never run from one text into the next
+    'Ends with an address jane@',
+    'example.com starts this one, then 0803 123 4567',
+    'Call 1 555 123',
+    '4567 is not the rest of that number',
+    'Phone +2348031234567 and later +234 803 123 4567\nGPA: 3.85',
+    'Tel 555-123-4567 or 08031234567\nSecond Class Upper Honours',
+    'SECOND CLASS LOWER\nFirst Class',
+    # Characters that fold differently in regular expressions and str.lower()
+    'Gpa 3.5 İstanbul University\nDıstınction',
+    'Grade: B+ Grade, 72%\ncontact: a.b@mail.co.uk',
+    'Ends with digits 12345678901',
+]
+
+
+def corpus():
+    texts = list(TEXTS)
+    for seed in range(30):
+        texts.append(benchmark.make_cv_text(2, seed, benchmark.LAYOUTS[seed % len(benchmark.LAYOUTS)]))
+    return texts
+
+
+def test_columns_agree_with_extract_information():
+    texts = corpus()
+    rows = batch.to_rows(batch.extract_columns(texts))
+    assert len(rows) == len(texts)
+    for text, row in zip(texts, rows):
+        assert row == engine.extract_information(text), text
+
+
+def test_columns_agree_with_a_gazetteer():
+    gazetteer = engine.Gazetteer(benchmark.UNIVERSITIES[:3])
+    texts = corpus()
+    rows = batch.to_rows(batch.extract_columns(texts, gazetteer))
+    for text, row in zip(texts, rows):
+        assert row == engine.extract_information(text, gazetteer), text
+
+
+def test_missing_texts_give_empty_fields():
+    columns = batch.extract_columns([None, 'Email: a@b.com'])
+    assert batch.to_rows(columns)[0] == dict.fromkeys(batch.FIELDS, '')
+    assert columns['Email'] == ['', 'a@b.com']
+
+
+def test_arrow_input_and_records():
+    pyarrow = pytest.importorskip('pyarrow')
+    texts = corpus()
+    columns = batch.extract_columns(pyarrow.array(texts))
+    assert columns == batch.extract_columns(texts)
+    records = batch.to_records(columns)
+    for record, row in zip(records, batch.to_rows(columns)):
+        assert record == engine.CVRecord.from_dict(dict(row, Filename=''))
+    assert batch.to_arrow(columns).column('Email').to_pylist() == columns['Email']
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_refresh_cache(tmp_path, workers):
+    texts = corpus()[1:]
+    with cache.ResultCache(str(tmp_path / 'c.sqlite')) as result_cache:
+        for number, text in enumerate(texts):
+            result_cache.put_text(str(number), text)
+        assert batch.refresh_cache(result_cache, batch_size=7, workers=workers) == len(texts)
+        for number, text in enumerate(texts):
+            assert result_cache.get_result(str(number)) == engine.extract_information(text)
@@ -0,0 +1,126 @@
+"""
+Tests for the result cache: storage, invalidation when the extraction rules
+change, and least-recently-used eviction.
+"""
+
+import itertools
+import types
+
+import pytest
+
+import benchmark
+import cache
+import engine
+import jobs
+
+
+def fake_clock(monkeypatch):
+    # Every call is one second later, so access order is unambiguous
+    monkeypatch.setattr(cache, 'time', types.SimpleNamespace(time=itertools.count(1).__next__))
+
+
+def test_texts_and_results_round_trip(tmp_path):
+    with cache.ResultCache(str(tmp_path / 'c.sqlite')) as result_cache:
+        assert result_cache.get_text('h') is None
+        result_cache.put_text('h', 'some text')
+        result_cache.put_result('h', {'Name': 'A'})
+        result_cache.put_result('h', {'Name': 'B'}, variant='gazetteer=x')
+        assert result_cache.get_text('h') == 'some text'
+        assert result_cache.get_result('h') == {'Name': 'A'}
+        assert result_cache.get_result('h', 'gazetteer=x') == {'Name': 'B'}
+        result_cache.put_page_text('p', 'page')
+        assert result_cache.get_page_text('p') == 'page'
+
+
+def test_results_from_other_rules_are_dropped(tmp_path):
+    path = str(tmp_path / 'c.sqlite')
+    with cache.ResultCache(path, version='old') as result_cache:
+        result_cache.put_text('h', 'some text')
+        result_cache.put_result('h', {'Name': 'A'})
+        result_cache.put_result('h', {'Name': 'A'}, variant='gazetteer=x')
+    with cache.ResultCache(path, version='new') as result_cache:
+        assert result_cache.get_result('h') is None
+        assert result_cache.get_result('h', 'gazetteer=x') is None
+        # The text does not depend on the rules and is kept
+        assert result_cache.get_text('h') == 'some text'
+    with cache.ResultCache(path, version='old') as result_cache:
+        assert result_cache.get_result('h') is None
+
+
+def test_evict_drops_least_recently_used_texts_and_pages(tmp_path, monkeypatch):
+    fake_clock(monkeypatch)
+    with cache.ResultCache(str(tmp_path / 'c.sqlite'), max_bytes=10) as result_cache:
+        result_cache.put_text('a', 'aaaaa')
+        result_cache.put_result('a', {'Name': 'A'})
+        result_cache.put_text('b', 'bbbbb')
+        result_cache.put_result('b', {'Name': 'B'})
+        result_cache.get_text('a')
+        result_cache.put_page_text('p', 'ppppp')
+        result_cache.evict()
+        assert result_cache.get_text('b') is None
+        assert result_cache.get_result('b') is None
+        assert result_cache.get_text('a') == 'aaaaa'
+        assert result_cache.get_page_text('p') == 'ppppp'
+
+        # Reading p above made a the least recently used
+        result_cache.put_page_text('q', 'qqqqq')
+        result_cache.evict()
+        assert result_cache.get_text('a') is None
+        assert result_cache.get_page_text('p') == 'ppppp'
+        assert result_cache.get_page_text('q') == 'qqqqq'
+
+
+def test_eviction_while_inserting_does_not_raise(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, 'EVICT_EVERY', 1)
+    result_cache = cache.ResultCache(str(tmp_path / 'c.sqlite'), max_bytes=0)
+    result_cache.put_text('a', 'aaaaa')
+    result_cache.put_page_text('p', 'ppppp')
+    assert result_cache.get_text('a') is None
+    assert result_cache.get_page_text('p') is None
+    result_cache.close()
+
+
+def test_parse_file_with_a_full_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, 'EVICT_EVERY', 1)
+    pdf_path = str(tmp_path / 'cv.pdf')
+    benchmark.write_pdf(pdf_path, benchmark.make_cv_pages(1))
+    with cache.ResultCache(str(tmp_path / 'c.sqlite'), max_bytes=0) as result_cache:
+        for _ in range(2):
+            info = engine.parse_file(pdf_path, result_cache)
+            assert info['Filename'] == 'cv.pdf'
+            assert info['Email']
+
+
+def count_texts(path):
+    with cache.ResultCache(path) as result_cache:
+        return result_cache.conn.execute('SELECT COUNT(*) FROM texts').fetchone()[0]
+
+
+def test_trim_cache(tmp_path):
+    path = str(tmp_path / 'c.sqlite')
+    with cache.ResultCache(path) as result_cache:
+        for key in 'abc':
+            result_cache.put_text(key, 'x' * 10)
+    assert count_texts(path) == 3
+    cache.trim_cache(path, max_bytes=20)
+    assert count_texts(path) == 2
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_a_job_keeps_the_cache_within_its_size(tmp_path, workers):
+    # Worker caches are never closed, the job trims the cache once it is done
+    paths = []
+    for seed in range(3):
+        paths.append(str(tmp_path / f'cv_{seed}.pdf'))
+        benchmark.write_pdf(paths[-1], benchmark.make_cv_pages(1, seed))
+    path = str(tmp_path / 'c.sqlite')
+    jobs.ParseJob(paths, workers=workers, cache_path=path).run()
+    assert count_texts(path) == 3
+    jobs.ParseJob(paths, workers=workers, cache_path=path, cache_max_bytes=0).run()
+    assert count_texts(path) == 0
+
+
+def test_file_hash_of_path_and_buffer_agree(tmp_path):
+    path = tmp_path / 'file.bin'
+    path.write_bytes(b'%PDF-1.4 contents')
+    assert cache.file_hash(str(path)) == cache.file_hash(b'%PDF-1.4 contents')
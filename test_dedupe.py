@@ -0,0 +1,127 @@
+"""
+Tests for grouping CVs from the same candidate.
+"""
+
+import random
+
+import pytest
+
+import benchmark
+import cv_parser
+import dedupe
+import writers
+
+WORDS = ('managed delivered team project budget client report design system data analysis training '
+         'quarterly results stakeholders community outreach payments integration schedule research').split()
+
+
+def cv_text(seed, words=300):
+    rng = random.Random(seed)
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+def edited(text, changes, seed=0):
+    words = text.split()
+    rng = random.Random(seed)
+    for _ in range(changes):
+        words[rng.randrange(len(words))] = 'edited'
+    return ' '.join(words)
+
+
+def row(filename, text=None, email='', phone=''):
+    info = {'Filename': filename, 'Name': '', 'Email': email, 'Phone': phone, 'University': '', 'Grade': ''}
+    if text is not None:
+        info[dedupe.SIGNATURE_KEY] = dedupe.text_signature(text)
+    return info
+
+
+def test_signatures():
+    text = cv_text(1)
+    assert dedupe.text_signature('too short') is None
+    assert len(dedupe.text_signature(text)) == dedupe.SIGNATURE_SIZE
+    assert dedupe.similarity(dedupe.text_signature(text), dedupe.text_signature(text)) == 1.0
+    assert dedupe.similarity(dedupe.text_signature(text), dedupe.text_signature(edited(text, 3))) > 0.6
+    assert dedupe.similarity(dedupe.text_signature(text), dedupe.text_signature(cv_text(2))) < 0.3
+
+
+def test_same_email_or_phone_groups():
+    index = dedupe.DuplicateIndex()
+    assert index.add(row('a.pdf', email='Ann@Example.com')) == 'a.pdf'
+    assert index.add(row('b.pdf', email='ann@example.com ')) == 'a.pdf'
+    assert index.add(row('c.pdf', phone='0803 123 4567')) == 'c.pdf'
+    assert index.add(row('d.pdf', phone='+2348031234567')) == 'c.pdf'
+    assert index.add(row('e.pdf', email='someone@example.com')) == 'e.pdf'
+    assert (len(index), index.candidates) == (5, 3)
+
+
+def test_similar_texts_group():
+    text = cv_text(1)
+    index = dedupe.DuplicateIndex()
+    assert index.add(row('v1.pdf', text, email='ann@example.com')) == 'v1.pdf'
+    # A new version with a new email address, the phone not found
+    assert index.add(row('v2.pdf', edited(text, 5), email='ann@work.com')) == 'v1.pdf'
+    assert index.add(row('other.pdf', cv_text(2))) == 'other.pdf'
+
+
+def test_a_new_email_with_the_same_phone_is_the_same_candidate():
+    text = cv_text(1)
+    index = dedupe.DuplicateIndex()
+    index.add(row('v1.pdf', text, email='ann@example.com', phone='08031234567'))
+    assert index.add(row('v2.pdf', edited(text, 5), email='ann@work.com', phone='08031234567')) == 'v1.pdf'
+
+
+def test_different_email_and_phone_veto_a_text_match():
+    # Two people filling in the same template
+    text = cv_text(1)
+    index = dedupe.DuplicateIndex()
+    index.add(row('ann.pdf', text, email='ann@example.com', phone='08031234567'))
+    assert index.add(row('bob.pdf', text, email='bob@example.com', phone='08099998888')) == 'bob.pdf'
+    assert index.candidates == 2
+
+
+def test_a_linking_cv_joins_the_older_group():
+    index = dedupe.DuplicateIndex()
+    index.add(row('a.pdf', email='ann@example.com'))
+    index.add(row('b.pdf', phone='08031234567'))
+    assert index.add(row('c.pdf', email='ann@example.com', phone='08031234567')) == 'a.pdf'
+    # The groups are not merged: rows already written keep their id
+    assert index.add(row('d.pdf', phone='08031234567')) == 'b.pdf'
+
+
+def test_written_rows_keep_their_candidate_id():
+    index = dedupe.DuplicateIndex()
+    assert index.add_written(dict(row('a.pdf', email='ann@example.com'), candidate_id='a.pdf')) == 'a.pdf'
+    # A second version written earlier, already in the first one's group
+    assert index.add_written(dict(row('b.pdf', phone='08031234567'), candidate_id='a.pdf')) == 'a.pdf'
+    assert index.add_written(dict(row('c.pdf', email='cy@example.com'), candidate_id='c.pdf')) == 'c.pdf'
+    assert index.candidates == 2
+    assert index.add(row('d.pdf', cv_text(1), phone='+234 803 123 4567')) == 'a.pdf'
+    assert index.add(row('e.pdf', cv_text(2), email='CY@example.com')) == 'c.pdf'
+    assert index.add(row('f.pdf', cv_text(3), email='dee@example.com')) == 'f.pdf'
+
+
+def write_cv(path, seed):
+    benchmark.write_pdf(str(path), benchmark.make_cv_pages(1, seed))
+    return str(path)
+
+
+@pytest.mark.parametrize('extension', ['csv', 'jsonl'])
+def test_resumed_run_groups_with_the_rows_already_written(tmp_path, extension):
+    first = write_cv(tmp_path / 'a_first.pdf', 1)
+    output = str(tmp_path / f'results.{extension}')
+    assert cv_parser.main([first, '-o', output, '--dedupe', '-j', '1', '-q']) == 0
+    # The same CV sent again under another name, and someone else's
+    again = write_cv(tmp_path / 'b_again.pdf', 1)
+    other = write_cv(tmp_path / 'c_other.pdf', 2)
+    assert cv_parser.main([first, again, other, '-o', output, '--dedupe', '--resume', '-j', '1', '-q']) == 0
+    with writers.open_writer(output, resume=True, fieldnames=dedupe.FIELDNAMES) as writer:
+        rows = {row['Filename']: row[dedupe.CANDIDATE_FIELD] for row in writer.previous_rows()}
+    assert rows == {'a_first.pdf': 'a_first.pdf', 'b_again.pdf': 'a_first.pdf', 'c_other.pdf': 'c_other.pdf'}
+
+
+def test_resuming_a_file_written_without_dedupe_is_refused(tmp_path, capsys):
+    first = write_cv(tmp_path / 'a_first.pdf', 1)
+    output = str(tmp_path / 'results.jsonl')
+    assert cv_parser.main([first, '-o', output, '-j', '1', '-q']) == 0
+    assert cv_parser.main([first, '-o', output, '--dedupe', '--resume', '-j', '1', '-q']) == 2
+    assert 'write to a new file' in capsys.readouterr().err
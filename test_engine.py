@@ -0,0 +1,163 @@
+"""
+Tests for the extraction engine.
+"""
+
+import hashlib
+import re
+
+import pytest
+
+import benchmark
+import engine
+
+
+def test_early_exit_stops_once_every_field_is_found():
+    pages = ['\n'.join(page) for page in benchmark.make_cv_pages(5)]
+    read = []
+
+    def counted():
+        for page in pages:
+            read.append(page)
+            yield page
+
+    text, info = engine.extract_information_from_pages(counted(), early_exit=True)
+    assert all(info.values())
+    assert len(read) < len(pages)
+    assert info == engine.extract_information(text)
+
+
+def test_early_exit_reads_on_when_a_field_is_missing():
+    # No grade anywhere: every page is read, and the fields are those of the whole text
+    pages = ['\n'.join(line for line in page if 'GPA' not in line and 'Grade' not in line)
+             for page in benchmark.make_cv_pages(5, layout='contact-first')]
+    full_text = ''.join(page + '\n' for page in pages)
+    text, info = engine.extract_information_from_pages(iter(pages), early_exit=True)
+    assert text == full_text
+    assert info == engine.extract_information(full_text)
+
+
+def test_max_pages_limits_the_pages_read():
+    pages = ['\n'.join(page) for page in benchmark.make_cv_pages(5)]
+    read = []
+
+    def counted():
+        for page in pages:
+            read.append(page)
+            yield page
+
+    text, info = engine.extract_information_from_pages(counted(), max_pages=2)
+    assert len(read) == 2
+    assert text == pages[0] + '\n' + pages[1] + '\n'
+    assert info == engine.extract_information(text)
+
+
+def test_gazetteer_longest_name_wins_when_names_overlap():
+    gazetteer = engine.Gazetteer(['Lagos State', 'State University of Lagos'])
+    assert gazetteer.find('lagos state university of lagos') == 'State University of Lagos'
+    assert gazetteer.find('a degree from lagos state, 2019') == 'Lagos State'
+    assert gazetteer.find('state university of\nlagos') == 'State University of Lagos'
+    assert gazetteer.find('nothing known here') is None
+
+
+def test_keyword_lines_lists_each_matching_line_once():
+    text = 'Jane Doe\nUniversity of Lagos, law school\nSkills\nYaba College'
+    lowered = text.lower()
+    lines = engine._keyword_lines(lowered, lowered.split('\n'), engine.UNIVERSITY_SEARCH_KEYWORDS)
+    assert lines == [1, 3]
+
+
+def test_university_is_the_longest_keyword_line_joined_with_its_neighbours():
+    text = 'Jane Doe\nUniversity of Lagos\nB.Sc. Economics\nEmail: jane@mail.org\nYaba College'
+    assert engine.extract_information(text)['University'] == 'University of Lagos Jane Doe B.Sc. Economics'
+
+
+def test_unreadable_files_are_passed_to_on_error(tmp_path, capsys):
+    not_pdf = tmp_path / 'notes.pdf'
+    not_pdf.write_text('not a PDF')
+    errors = []
+    assert engine.parse_file(str(not_pdf), on_error=errors.append) is None
+    assert [str(error) for error in errors] == ['not a PDF file']
+    # Without on_error the reason goes to stderr, never to stdout
+    assert engine.parse_file(str(not_pdf)) is None
+    out, err = capsys.readouterr()
+    assert out == ''
+    assert 'not a PDF file' in err
+
+
+def test_file_hash_is_returned_with_the_row(tmp_path):
+    pdf_path = tmp_path / 'cv.pdf'
+    benchmark.write_pdf(str(pdf_path), benchmark.make_cv_pages(1))
+    info = engine.parse_file(str(pdf_path), file_hash=True)
+    assert info[engine.HASH_KEY] == hashlib.sha256(pdf_path.read_bytes()).hexdigest()
+    assert engine.HASH_KEY not in engine.parse_file(str(pdf_path))
+
+
+def test_cv_record_reads_like_a_row():
+    info = dict(engine.extract_information(benchmark.make_cv_text()), Filename='cv.pdf', _signature=[1])
+    record = engine.CVRecord.from_dict(info)
+    assert record.as_dict() == {field: info[field] for field in engine.FIELDNAMES}
+    assert record['Email'] == record.get('Email') == record.Email == info['Email']
+    assert record.get('_signature') is None
+    with pytest.raises(KeyError):
+        record['_signature']
+    with pytest.raises(AttributeError):
+        record.extra = 1
+    assert record == engine.CVRecord.from_dict(record.as_dict())
+    assert eval(repr(record), {'CVRecord': engine.CVRecord}) == record
+
+
+@pytest.mark.parametrize('pattern, triggers', [
+    (r'\+?234\s*[0-9]{10}', (('234',), 10)),
+    (r'0[7-9][0-1][0-9]{8}', (('0',), 11)),
+    (r'gpa[:\s]*([0-9]\.[0-9]{1,2})', (('gpa', '.'), 0)),
+    (r'([0-9]{1,2})%', (('%',), 0)),
+    # Optional or alternative parts require nothing
+    (r'(a|b)c', (('c',), 0)),
+    (r'x(?i:abc)', (('x',), 0)),
+    # Runs broken by an optional separator, or too short to be worth checking
+    (r'[0-9]{4}-?[0-9]{4}', ((), 0)),
+])
+def test_pattern_triggers(pattern, triggers):
+    assert engine.pattern_triggers(re.compile(pattern)) == triggers
+
+
+def test_case_insensitive_patterns_have_no_triggers():
+    assert engine.pattern_triggers(re.compile('GPA', re.IGNORECASE)) == ((), 0)
+
+
+def test_longest_digit_run():
+    assert engine.longest_digit_run('born 1990, call 12345') == 0
+    assert engine.longest_digit_run('ref 1234567 or 08031234567') == 11
+
+
+TRIGGER_TEXTS = [
+    'Phone: +234 803 123 4567', 'Phone: +2348031234567', 'Tel +234 (0)803 123 4567',
+    'Mobile 08031234567', 'Call +1 (555) 123-4567', 'Fax 4412345678901', 'born 1990, call 12345',
+    'GPA: 3.85', 'gpa 4.2/5.0', '3.5 GPA', '72% overall', 'B+ Grade', 'A (4.5)',
+    'Second Class Upper Honours', 'first class division', 'DISTINCTION', 'Pass Class',
+    'İstanbul Technical University, GPA 3.1', 'no grade, no phone',
+] + [benchmark.make_cv_text(1, seed, layout) for seed in range(6) for layout in benchmark.LAYOUTS]
+
+
+@pytest.mark.parametrize('family', [engine.PHONE_FAMILY, engine.GRADE_FAMILY], ids=['phone', 'grade'])
+def test_triggers_never_skip_a_pattern_that_matches(family):
+    for text in TRIGGER_TEXTS:
+        scanned = engine.fold_text(text) if family.folded else text
+        if scanned is None:
+            continue
+        longest_run = engine.longest_digit_run(scanned)
+        for pattern, (literals, digit_run) in zip(family.folded or family.patterns, family.triggers):
+            if pattern.search(scanned):
+                assert engine.may_match((literals, digit_run), scanned), (pattern.pattern, text)
+                assert longest_run >= digit_run, (pattern.pattern, text)
+
+
+@pytest.mark.parametrize('family', [engine.PHONE_FAMILY, engine.GRADE_FAMILY], ids=['phone', 'grade'])
+def test_family_search_finds_what_trying_each_pattern_finds(family):
+    for text in TRIGGER_TEXTS:
+        expected = next(((index, pattern.search(text)) for index, pattern in enumerate(family.patterns)
+                         if pattern.search(text)), (None, None))
+        index, match = family.search(text, engine.fold_text(text))
+        assert index == expected[0], text
+        if match is not None:
+            assert family.value(index, match, text) == family.value(*expected, text)
@@ -0,0 +1,128 @@
+"""
+Tests for ParseJob: results, errors, pausing, cancelling and progress updates.
+"""
+
+import itertools
+import os
+
+import pytest
+
+import benchmark
+import engine
+import jobs
+
+TIMEOUT = 30
+
+
+@pytest.fixture(scope='module')
+def pdf_paths(tmp_path_factory):
+    folder = tmp_path_factory.mktemp('cvs')
+    paths = []
+    for seed in range(6):
+        path = str(folder / f'cv_{seed}.pdf')
+        benchmark.write_pdf(path, benchmark.make_cv_pages(1, seed))
+        paths.append(path)
+    return paths
+
+
+def wait_for_state(job, state):
+    for _ in range(TIMEOUT * 100):
+        if job.state == state:
+            return
+        job.wait(0.01)
+    raise AssertionError(f"job still {job.state}, not {state}")
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_run_keeps_input_order(pdf_paths, workers):
+    job = jobs.ParseJob(pdf_paths, workers=workers, chunksize=1)
+    results = job.run()
+    assert [info['Filename'] for info in results] == [os.path.basename(path) for path in pdf_paths]
+    assert all(isinstance(info, engine.CVRecord) for info in results)
+    assert job.state == jobs.FINISHED
+    assert (job.done, job.parsed, job.failed) == (6, 6, 0)
+
+
+def test_unreadable_files_come_back_with_an_error(pdf_paths, tmp_path):
+    not_pdf = tmp_path / 'notes.pdf'
+    not_pdf.write_text('not a PDF')
+    results = {os.path.basename(pdf_path): (info, error)
+               for pdf_path, info, error, _ in jobs.ParseJob([pdf_paths[0], str(not_pdf)], workers=1)}
+    assert results['cv_0.pdf'][1] is None
+    assert results['notes.pdf'] == (None, 'not a PDF file')
+
+
+def test_cancel_while_iterating(pdf_paths):
+    job = jobs.ParseJob(pdf_paths, workers=1, chunksize=1)
+    seen = 0
+    for _ in job:
+        seen += 1
+        if seen == 2:
+            job.cancel()
+    assert job.state == jobs.CANCELLED
+    assert job.cancelled
+    assert 2 <= job.done < len(pdf_paths)
+    assert len(job.results) == job.parsed == job.done
+
+
+def test_pause_holds_the_job_until_resumed(pdf_paths):
+    updates = []
+    job = jobs.ParseJob(pdf_paths, workers=1, chunksize=1, on_progress=updates.append, max_updates_per_second=0)
+    job.pause()
+    job.start()
+    wait_for_state(job, jobs.PAUSED)
+    assert job.done == 0
+    job.resume()
+    assert job.wait(TIMEOUT)
+    assert job.state == jobs.FINISHED
+    assert job.done == len(pdf_paths)
+    states = [progress.state for progress in updates]
+    assert jobs.PAUSED in states
+    assert states[-1] == jobs.FINISHED
+    assert updates[-1].fraction == 1.0
+
+
+def test_cancel_releases_a_paused_job(pdf_paths):
+    job = jobs.ParseJob(pdf_paths, workers=2, chunksize=1)
+    job.pause()
+    job.start()
+    wait_for_state(job, jobs.PAUSED)
+    job.cancel()
+    assert job.wait(TIMEOUT)
+    assert job.state == jobs.CANCELLED
+    assert job.done == 0
+    # Pausing a cancelled job does nothing
+    job.pause()
+    assert job._unpaused.is_set()
+
+
+def test_a_job_runs_once(pdf_paths):
+    job = jobs.ParseJob(pdf_paths[:1], workers=1)
+    job.run()
+    with pytest.raises(RuntimeError):
+        job.run()
+
+
+def test_unordered_run_yields_every_file(pdf_paths):
+    job = jobs.ParseJob(pdf_paths, workers=2, chunksize=1, ordered=False)
+    assert sorted(pdf_path for pdf_path, _, _, _ in job) == sorted(pdf_paths)
+    assert job.parsed == len(pdf_paths)
+
+
+def test_progress_updates_are_throttled(pdf_paths, monkeypatch):
+    clock = itertools.count()
+    monkeypatch.setattr(jobs.time, 'perf_counter', lambda: next(clock) / 1000)
+    updates = []
+    # One update a second at most, and the fake clock moves 1ms per reading
+    jobs.ParseJob(pdf_paths, workers=1, on_progress=updates.append, max_updates_per_second=1).run()
+    assert [progress.state for progress in updates] == [jobs.RUNNING, jobs.FINISHED]
+    assert updates[-1].done == len(pdf_paths)
+
+
+def test_progress_description():
+    progress = jobs.JobProgress(jobs.RUNNING, 30, 90, 29, 1, 10.0, 'cv.pdf', ocr_pending=2)
+    assert progress.rate == 3.0
+    assert progress.eta == 20.0
+    assert progress.describe() == '30/90 (3.0 files/sec, 20s left), 2 in OCR'
+    assert jobs.JobProgress(jobs.READY, 0, 90, 0, 0, 0.0, None).describe() == '0/90'
+    assert [jobs.format_seconds(seconds) for seconds in (59.4, 61, 3720)] == ['59s', '1m01s', '1h02m']
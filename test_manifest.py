@@ -0,0 +1,108 @@
+"""
+Tests for the input manifest behind --incremental runs.
+"""
+
+import os
+
+import benchmark
+import cache
+import cv_parser
+import engine
+import manifest
+
+OPTIONS = manifest.options_key('pypdf2')
+
+
+def write(path, contents):
+    with open(path, 'wb') as file:
+        file.write(contents)
+    return str(path)
+
+
+def recorded(tmp_path, contents):
+    """A manifest saved with one entry per name in contents, reopened."""
+    paths = {name: write(tmp_path / name, data) for name, data in contents.items()}
+    inputs = manifest.Manifest(str(tmp_path / 'results.csv.manifest.json'), OPTIONS)
+    unchanged, to_parse, removed = inputs.plan(paths.values())
+    assert (unchanged, removed) == ([], [])
+    assert to_parse == list(paths.values())
+    for name, pdf_path in paths.items():
+        inputs.record(pdf_path, {'Filename': name, 'Name': name.upper()})
+    inputs.save()
+    return paths, manifest.Manifest(inputs.path, OPTIONS)
+
+
+def test_unchanged_files_are_not_read(tmp_path, monkeypatch):
+    paths, inputs = recorded(tmp_path, {'a.pdf': b'aaa', 'b.pdf': b'bbb'})
+
+    def no_hashing(path):
+        raise AssertionError(f"{path} was read")
+    monkeypatch.setattr(cache, 'file_hash', no_hashing)
+    assert inputs.plan(paths.values()) == (list(paths.values()), [], [])
+    assert inputs.row(paths['a.pdf']) == {'Filename': 'a.pdf', 'Name': 'A.PDF'}
+
+
+def test_touched_file_is_recognised_by_its_hash(tmp_path):
+    paths, inputs = recorded(tmp_path, {'a.pdf': b'aaa'})
+    stat = os.stat(paths['a.pdf'])
+    os.utime(paths['a.pdf'], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert inputs.plan(paths.values()) == ([paths['a.pdf']], [], [])
+    key = os.path.abspath(paths['a.pdf'])
+    assert inputs.entries[key]['mtime_ns'] == stat.st_mtime_ns + 10 ** 9
+
+
+def test_changed_files_are_parsed_again(tmp_path):
+    paths, inputs = recorded(tmp_path, {'same_size.pdf': b'aaa', 'grown.pdf': b'bbb'})
+    stat = os.stat(paths['same_size.pdf'])
+    write(paths['same_size.pdf'], b'xyz')
+    os.utime(paths['same_size.pdf'], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    write(paths['grown.pdf'], b'bbbb')
+    assert inputs.plan(paths.values()) == ([], list(paths.values()), [])
+
+
+def test_deleted_files_are_removed(tmp_path):
+    paths, inputs = recorded(tmp_path, {'a.pdf': b'aaa', 'b.pdf': b'bbb'})
+    os.remove(paths['b.pdf'])
+    unchanged, to_parse, removed = inputs.plan([paths['a.pdf']])
+    assert (unchanged, to_parse, removed) == ([paths['a.pdf']], [], [os.path.abspath(paths['b.pdf'])])
+    assert os.path.abspath(paths['b.pdf']) not in inputs.entries
+
+
+def test_other_settings_start_over(tmp_path):
+    paths, inputs = recorded(tmp_path, {'a.pdf': b'aaa'})
+    other = manifest.Manifest(inputs.path, manifest.options_key('pdfium'))
+    assert other.stale
+    assert other.plan(paths.values()) == ([], list(paths.values()), [])
+
+
+def test_record_takes_the_hash_from_the_row(tmp_path, monkeypatch):
+    pdf_path = write(tmp_path / 'a.pdf', b'aaa')
+    monkeypatch.setattr(cache, 'file_hash', lambda path: 'read again')
+    inputs = manifest.Manifest(str(tmp_path / 'm.json'), OPTIONS)
+    inputs.record(pdf_path, {'Filename': 'a.pdf', engine.HASH_KEY: 'from the worker'})
+    entry = inputs.entries[os.path.abspath(pdf_path)]
+    assert entry['hash'] == 'from the worker'
+    assert entry['row'] == {'Filename': 'a.pdf'}
+    # Files without text come back without a row, and are hashed here
+    inputs.record(pdf_path, None)
+    assert inputs.entries[os.path.abspath(pdf_path)]['hash'] == 'read again'
+
+
+def test_incremental_run_keeps_unchanged_rows(tmp_path, capsys):
+    folder = tmp_path / 'cvs'
+    folder.mkdir()
+    for seed in range(3):
+        benchmark.write_pdf(str(folder / f'cv_{seed}.pdf'), benchmark.make_cv_pages(1, seed))
+    output = tmp_path / 'results.csv'
+    argv = [str(folder), '-o', str(output), '--incremental', '-j', '1']
+    assert cv_parser.main(argv) == 0
+    first = output.read_text()
+    assert 'processed 3 CV(s), kept 0 unchanged' in capsys.readouterr().err
+
+    benchmark.write_pdf(str(folder / 'cv_1.pdf'), benchmark.make_cv_pages(1, 7))
+    assert cv_parser.main(argv) == 0
+    assert 'processed 1 CV(s), kept 2 unchanged' in capsys.readouterr().err
+    rows = output.read_text().splitlines()
+    assert len(rows) == 4
+    assert rows[1] == first.splitlines()[1]
+    assert rows[2] != first.splitlines()[2]
@@ -0,0 +1,75 @@
+"""
+Tests for the per-file metrics and the run summary.
+"""
+
+import json
+
+import benchmark
+import engine
+import metrics
+
+
+def test_parse_file_records_stages_and_patterns(tmp_path):
+    pdf_path = str(tmp_path / 'cv.pdf')
+    benchmark.write_pdf(pdf_path, benchmark.make_cv_pages(2))
+    file_metrics = metrics.FileMetrics(pdf_path)
+    info = engine.parse_file(pdf_path, metrics=file_metrics)
+    assert info['Email']
+    assert file_metrics.status == 'ok'
+    assert set(file_metrics.stages) == {'pdf_text', 'fields'}
+    assert file_metrics.pages == 2
+    assert file_metrics.text_length > 0
+    assert file_metrics.matched['Email'] == 'email'
+
+
+def test_failures_are_recorded(tmp_path):
+    not_pdf = tmp_path / 'notes.pdf'
+    not_pdf.write_text('not a PDF')
+    file_metrics = metrics.FileMetrics(str(not_pdf))
+    assert engine.parse_file(str(not_pdf), metrics=file_metrics) is None
+    assert (file_metrics.status, file_metrics.error) == ('rejected', 'not a PDF file')
+
+
+def test_summary_and_sidecar(tmp_path):
+    sidecar = tmp_path / 'metrics.jsonl'
+    summary = metrics.MetricsSummary(str(sidecar))
+    for index in range(3):
+        file_metrics = metrics.FileMetrics(f'cv_{index}.pdf')
+        file_metrics.add_stage('pdf_text', 0.01 * (index + 1))
+        file_metrics.add_stage('pdf_text', 0.01)
+        file_metrics.pages = 2
+        file_metrics.matched['Phone'] = 'phone[0]' if index else 'phone[3]'
+        summary.add(file_metrics)
+    failed = metrics.FileMetrics('bad.pdf')
+    failed.fail('error', ValueError('EOF marker not found'))
+    failed.add_ocr_page(1, 0.5, 'timeout')
+    summary.add(failed)
+    summary.close()
+
+    assert summary.files == 4
+    assert summary.by_status == {'ok': 3, 'error': 1}
+    assert summary.pages == 6
+    assert summary.matched == {'Phone': {'phone[0]': 2, 'phone[3]': 1}}
+    report = summary.report()
+    assert 'status: error=1, ok=3' in report
+    assert 'pdf_text' in report
+    assert 'Phone      phone[0]=2, phone[3]=1' in report
+    assert 'OCR: 1 page(s), 0 from cache, 1 timed out' in report
+    assert 'error: bad.pdf: EOF marker not found' in report
+
+    records = [json.loads(line) for line in sidecar.read_text().splitlines()]
+    assert [record['path'] for record in records] == ['cv_0.pdf', 'cv_1.pdf', 'cv_2.pdf', 'bad.pdf']
+    assert records[0]['stages_ms'] == {'pdf_text': 20.0}
+    assert records[3]['ocr_pages'] == [{'page': 1, 'ms': 500.0, 'status': 'timeout'}]
+    assert records[3]['stages_ms'] == {'ocr': 500.0}
+
+
+def test_report_lists_only_the_first_failures():
+    summary = metrics.MetricsSummary()
+    for index in range(12):
+        file_metrics = metrics.FileMetrics(f'cv_{index}.pdf')
+        file_metrics.fail('no_text', 'no extractable text')
+        summary.add(file_metrics)
+    report = summary.report(max_failures=10)
+    assert report.count('no_text: ') == 10
+    assert '... and 2 more failure(s)' in report
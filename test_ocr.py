@@ -0,0 +1,124 @@
+"""
+Tests for the OCR fallback, with a stand-in for the tesseract program, and
+for which files ParseJob sends to it.
+"""
+
+import os
+import stat
+
+import pytest
+
+import backends
+import benchmark
+import jobs
+import ocr
+import parallel
+
+OCR_TEXT = 'Jane Scanned\nEmail: jane.scan@example.com\nPhone: +44 7700 900123\nUniversity of Leeds\nGPA: 3.8\n'
+
+pytestmark = pytest.mark.skipif(not backends.is_available('pdfium'), reason="OCR needs pypdfium2")
+
+
+@pytest.fixture
+def tesseract_calls(tmp_path, monkeypatch):
+    """Path of the file the fake tesseract appends a line to on every call."""
+    calls = tmp_path / 'calls.log'
+    script = tmp_path / 'tesseract'
+    script.write_text(f"#!/bin/sh\ncat > /dev/null\necho \"$@\" >> '{calls}'\nprintf '{OCR_TEXT}'\n", newline='\n')
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv(ocr.ENV_VARIABLE, str(script))
+    calls.write_text('')
+    return calls
+
+
+def call_count(calls):
+    return len(calls.read_text().splitlines())
+
+
+def write_scan(path, pages=1):
+    # Pages without any text, as a scanner produces them
+    benchmark.write_pdf(str(path), [[] for _ in range(pages)])
+    return str(path)
+
+
+real_ocr_task = ocr.ocr_task
+
+
+def logged_ocr_task(task):
+    # Runs in the OCR pool's processes, which inherit the environment
+    with open(os.environ['TEST_OCR_TASKS'], 'a', encoding='utf-8') as log:
+        log.write(os.path.basename(task[0][0]) + '\n')
+    return real_ocr_task(task)
+
+
+def ocr_task(pdf_path, cache_path=None):
+    return ocr.ocr_task(ocr.make_task(parallel.make_task(pdf_path, cache_path=cache_path)))
+
+
+def test_pages_without_text_are_read_by_ocr(tmp_path, tesseract_calls):
+    scan = write_scan(tmp_path / 'scan.pdf', pages=2)
+    pdf_path, info, error, _ = ocr_task(scan)
+    assert (pdf_path, error) == (scan, None)
+    assert info['Filename'] == 'scan.pdf'
+    assert info['Email'] == 'jane.scan@example.com'
+    # Early exit is off, so both pages were read
+    assert call_count(tesseract_calls) == 2
+
+
+def test_pages_with_text_are_not_ocrd(tmp_path, tesseract_calls):
+    pdf_path = str(tmp_path / 'cv.pdf')
+    benchmark.write_pdf(pdf_path, benchmark.make_cv_pages(1))
+    _, info, error, _ = ocr_task(pdf_path)
+    assert error is None
+    assert info['Email'] != 'jane.scan@example.com'
+    assert call_count(tesseract_calls) == 0
+
+
+def test_ocr_text_is_cached_by_page_image(tmp_path, tesseract_calls):
+    cache_path = str(tmp_path / 'c.sqlite')
+    first = write_scan(tmp_path / 'first.pdf')
+    second = write_scan(tmp_path / 'second.pdf')
+    assert ocr_task(first, cache_path)[1]['Email'] == 'jane.scan@example.com'
+    # Same page image in another file
+    assert ocr_task(second, cache_path)[1]['Email'] == 'jane.scan@example.com'
+    assert call_count(tesseract_calls) == 1
+
+
+def test_rejected_files_come_back_with_an_error(tmp_path, tesseract_calls):
+    not_pdf = tmp_path / 'notes.pdf'
+    not_pdf.write_text('not a PDF')
+    assert ocr_task(str(not_pdf)) == (str(not_pdf), None, 'not a PDF file', None)
+
+
+def test_tesseract_failure_is_reported(tmp_path, monkeypatch):
+    monkeypatch.setenv(ocr.ENV_VARIABLE, os.path.join(str(tmp_path), 'missing-tesseract'))
+    _, info, error, _ = ocr_task(write_scan(tmp_path / 'scan.pdf'))
+    assert info is None
+    assert error
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_job_sends_only_files_without_text_to_ocr(tmp_path, tesseract_calls, workers, monkeypatch):
+    ocr_tasks = tmp_path / 'ocr_tasks.log'
+    ocr_tasks.write_text('')
+    monkeypatch.setenv('TEST_OCR_TASKS', str(ocr_tasks))
+    monkeypatch.setattr(ocr, 'ocr_task', logged_ocr_task)
+    text_cv = str(tmp_path / 'a_text.pdf')
+    benchmark.write_pdf(text_cv, benchmark.make_cv_pages(1))
+    scan = write_scan(tmp_path / 'b_scan.pdf')
+    not_pdf = tmp_path / 'c_notes.pdf'
+    not_pdf.write_text('not a PDF')
+    large = str(tmp_path / 'd_large.pdf')
+    benchmark.write_pdf(large, [[]] * 20)
+    job = jobs.ParseJob([text_cv, scan, str(not_pdf), large], workers=workers, ocr_options={},
+                        ocr_workers=1, max_file_size=os.path.getsize(large) - 1)
+    results = {os.path.basename(pdf_path): (info, error) for pdf_path, info, error, _ in job}
+    assert results['a_text.pdf'][0]['Email'] != 'jane.scan@example.com'
+    assert results['b_scan.pdf'][0]['Email'] == 'jane.scan@example.com'
+    # Files refused or unreadable on the text path are not tried again by OCR
+    assert results['c_notes.pdf'] == (None, 'not a PDF file')
+    assert results['d_large.pdf'][0] is None
+    assert 'byte limit' in results['d_large.pdf'][1]
+    assert ocr_tasks.read_text().splitlines() == ['b_scan.pdf']
+    assert call_count(tesseract_calls) == 1
+    assert [info['Filename'] for info in job.results] == ['a_text.pdf', 'b_scan.pdf']
@@ -0,0 +1,126 @@
+"""
+Tests for the ingestion service: backpressure, restarting crashed workers,
+filing away inbox uploads and the stdin/stdout mode.
+"""
+
+import asyncio
+import concurrent.futures
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import benchmark
+import parallel
+import service
+
+
+def write_cvs(directory, count):
+    paths = []
+    for seed in range(count):
+        paths.append(str(directory / f'cv_{seed}.pdf'))
+        benchmark.write_pdf(paths[-1], benchmark.make_cv_pages(1, seed))
+    return paths
+
+
+def test_submit_waits_while_the_queue_is_full():
+    async def scenario():
+        ingestion = service.IngestionService(workers=1, queue_size=2)
+        ingestion.queue = asyncio.Queue(maxsize=ingestion.queue_size)
+        await ingestion.submit('a.pdf')
+        await ingestion.submit('b.pdf')
+        # No worker is taking files, so the third one cannot get in
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(ingestion.submit('c.pdf'), 0.2)
+        await ingestion.queue.get()
+        await asyncio.wait_for(ingestion.submit('c.pdf'), 0.2)
+
+    asyncio.run(scenario())
+
+
+real_parse_task = parallel.parse_task
+
+
+def crash_on_crash_pdf(task):
+    if task[0].endswith('crash.pdf'):
+        os._exit(1)
+    return real_parse_task(task)
+
+
+def test_workers_are_restarted_after_a_crash(tmp_path, monkeypatch):
+    monkeypatch.setattr(parallel, 'parse_task', crash_on_crash_pdf)
+    paths = write_cvs(tmp_path, 3)
+    crash = str(tmp_path / 'crash.pdf')
+
+    async def scenario():
+        ingestion = service.IngestionService(workers=2, quiet=True)
+        ingestion.queue = asyncio.Queue(maxsize=ingestion.queue_size)
+        await ingestion.start_pool()
+        workers = [asyncio.create_task(ingestion._worker()) for _ in range(2)]
+        try:
+            futures = [await ingestion.submit(path) for path in [paths[0], crash] + paths[1:]]
+            return [await future for future in futures]
+        finally:
+            for worker in workers:
+                worker.cancel()
+            ingestion.pool.shutdown()
+
+    results = asyncio.run(scenario())
+    assert [pdf_path for pdf_path, _, _ in results] == [paths[0], crash] + paths[1:]
+    assert results[1][1] is None
+    assert results[1][2] == "worker process died while parsing"
+    # The files parsed alongside the crash, and after it, still come through
+    for pdf_path, info, error in results[:1] + results[2:]:
+        assert info['Filename'] == os.path.basename(pdf_path), error
+
+
+def test_filed_away_uploads_do_not_overwrite_each_other(tmp_path):
+    inbox = tmp_path / 'incoming'
+    (inbox / service.PROCESSED_DIR).mkdir(parents=True)
+    (inbox / service.FAILED_DIR).mkdir()
+    ingestion = service.IngestionService(workers=1)
+    for number, info in enumerate([{'Name': 'A'}, {'Name': 'B'}, None]):
+        upload = inbox / 'CV.pdf'
+        upload.write_text(str(number))
+        done = concurrent.futures.Future()
+        done.set_result((str(upload), info, None))
+        taken = {str(upload)}
+        ingestion._file_away(str(inbox), str(upload), done, taken)
+        assert not taken
+    assert (inbox / service.PROCESSED_DIR / 'CV.pdf').read_text() == '0'
+    assert (inbox / service.PROCESSED_DIR / 'CV-1.pdf').read_text() == '1'
+    assert (inbox / service.FAILED_DIR / 'CV.pdf').read_text() == '2'
+    assert not (inbox / 'CV.pdf').exists()
+
+
+def test_columnar_output_is_refused(tmp_path, capsys, monkeypatch):
+    def started(*args, **kwargs):
+        pytest.fail("the service started")
+
+    monkeypatch.setattr(service, 'IngestionService', started)
+    assert service.main(['--stdio', '-o', str(tmp_path / 'results.parquet')]) == 2
+    assert '.csv or .jsonl' in capsys.readouterr().err
+    with pytest.raises(SystemExit):
+        service.main(['--stdio', '-o', str(tmp_path / 'results'), '-f', 'arrow'])
+    assert not os.listdir(tmp_path)
+
+
+def test_stdio_answers_one_line_per_path(tmp_path):
+    paths = write_cvs(tmp_path, 2)
+    missing = str(tmp_path / 'missing.pdf')
+    results = tmp_path / 'results.jsonl'
+    completed = subprocess.run(
+        [sys.executable, 'service.py', '--stdio', '-j', '1', '-q', '-o', str(results)],
+        input=''.join(path + '\n' for path in paths + [missing]), capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.abspath(service.__file__)), timeout=120
+    )
+    assert completed.returncode == 0, completed.stderr
+    replies = [json.loads(line) for line in completed.stdout.splitlines()]
+    assert [reply['path'] for reply in replies] == paths + [missing]
+    assert [reply['ok'] for reply in replies] == [True, True, False]
+    assert replies[0]['result']['Filename'] == 'cv_0.pdf'
+    assert replies[2]['error']
+    # Only the parsed files reach the results file
+    assert len(results.read_text().splitlines()) == 2
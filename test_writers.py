@@ -0,0 +1,167 @@
+"""
+Tests for the streaming and columnar result writers and resuming an
+interrupted run.
+"""
+
+import csv
+import json
+import os
+
+import pytest
+
+import writers
+
+
+def row(name):
+    return {'Filename': f'{name}.pdf', 'Name': name, 'Email': f'{name}@example.com',
+            'Phone': '', 'University': '', 'Grade': ''}
+
+
+@pytest.mark.parametrize('contents, expected', [
+    (b'', b''),
+    (b'a,b\r\nc,d\r\n', b'a,b\r\nc,d\r\n'),
+    (b'a,b\r\nc,d\r\ne,', b'a,b\r\nc,d\r\n'),
+    (b'half a row', b''),
+])
+def test_truncate_partial_line(tmp_path, contents, expected):
+    path = tmp_path / 'results.csv'
+    path.write_bytes(contents)
+    writers._truncate_partial_line(str(path))
+    assert path.read_bytes() == expected
+
+
+def test_truncate_partial_line_in_a_long_last_line(tmp_path):
+    # The last newline is further back than the tail that is searched
+    path = tmp_path / 'results.csv'
+    path.write_bytes(b'header\n' + b'x' * 100000)
+    writers._truncate_partial_line(str(path))
+    assert path.read_bytes() == b'header\n' + b'x' * 100000
+
+
+def test_csv_resume_skips_done_and_drops_a_partial_row(tmp_path):
+    path = str(tmp_path / 'results.csv')
+    with writers.open_writer(path) as writer:
+        writer.write(row('ann'))
+        writer.write(row('bob'))
+    with open(path, 'a', encoding='utf-8') as file:
+        file.write('carl.pdf,Car')
+    with writers.open_writer(path, resume=True) as writer:
+        assert writer.done == {'ann.pdf', 'bob.pdf'}
+        writer.write(row('dan'))
+    with open(path, newline='', encoding='utf-8') as file:
+        rows = list(csv.DictReader(file))
+    assert [r['Filename'] for r in rows] == ['ann.pdf', 'bob.pdf', 'dan.pdf']
+
+
+def test_without_resume_the_file_starts_afresh(tmp_path):
+    path = str(tmp_path / 'results.csv')
+    with writers.open_writer(path) as writer:
+        writer.write(row('ann'))
+    with writers.open_writer(path) as writer:
+        assert writer.done == set()
+        writer.write(row('bob'))
+    with open(path, newline='', encoding='utf-8') as file:
+        assert [r['Filename'] for r in csv.DictReader(file)] == ['bob.pdf']
+
+
+@pytest.mark.parametrize('output_format', writers.FORMATS)
+def test_resume_with_other_columns_is_refused(tmp_path, output_format):
+    if output_format in writers.COMPRESSIONS:
+        pytest.importorskip('pyarrow')
+    path = str(tmp_path / f'results.{output_format}')
+    with writers.open_writer(path) as writer:
+        writer.write(row('ann'))
+    with pytest.raises(ValueError, match='write to a new file'):
+        writers.open_writer(path, resume=True, fieldnames=writers.engine.FIELDNAMES + ['candidate_id'])
+    with pytest.raises(ValueError, match='write to a new file'):
+        writers.open_writer(path, resume=True, fieldnames=writers.engine.FIELDNAMES[:-1])
+    # The file is left as it was
+    with writers.open_writer(path, resume=True) as writer:
+        assert writer.done == {'ann.pdf'}
+
+
+@pytest.mark.parametrize('output_format', writers.FORMATS)
+def test_previous_rows(tmp_path, output_format):
+    if output_format in writers.COMPRESSIONS:
+        pytest.importorskip('pyarrow')
+    path = str(tmp_path / f'results.{output_format}')
+    with writers.open_writer(path) as writer:
+        assert list(writer.previous_rows()) == []
+        writer.write(row('ann'))
+        writer.write(row('bob'))
+    with writers.open_writer(path, resume=True) as writer:
+        assert list(writer.previous_rows()) == [row('ann'), row('bob')]
+
+
+def test_jsonl_resume(tmp_path):
+    path = str(tmp_path / 'results.jsonl')
+    with writers.open_writer(path) as writer:
+        writer.write(dict(row('ann'), _signature=[1, 2, 3]))
+    with open(path, 'a', encoding='utf-8') as file:
+        file.write('{"Filename": "bo')
+    with writers.open_writer(path, resume=True) as writer:
+        assert writer.done == {'ann.pdf'}
+        writer.write(row('bob'))
+    with open(path, encoding='utf-8') as file:
+        rows = [json.loads(line) for line in file]
+    assert [r['Filename'] for r in rows] == ['ann.pdf', 'bob.pdf']
+    # Keys that are not columns are not written
+    assert '_signature' not in rows[0]
+
+
+def test_resume_on_stdout_is_refused():
+    with pytest.raises(ValueError):
+        writers.open_writer('-', resume=True)
+
+
+def read_table(path, output_format):
+    pyarrow = pytest.importorskip('pyarrow')
+    if output_format == 'parquet':
+        import pyarrow.parquet
+        return pyarrow.parquet.read_table(path)
+    import pyarrow.ipc
+    with pyarrow.memory_map(path) as source:
+        return pyarrow.ipc.open_file(source).read_all()
+
+
+@pytest.mark.parametrize('output_format', ['parquet', 'arrow'])
+def test_columnar_output_in_row_groups(tmp_path, output_format):
+    pytest.importorskip('pyarrow')
+    path = str(tmp_path / f'results.{output_format}')
+    with writers.open_writer(path, row_group_size=2, compression='zstd') as writer:
+        for name in ('ann', 'bob', 'cat'):
+            writer.write(dict(row(name), _signature=[1, 2, 3]))
+        # Nothing is readable at path before the writer closes
+        assert not os.path.exists(path)
+    table = read_table(path, output_format)
+    assert table.column_names == writers.engine.FIELDNAMES
+    assert table.to_pylist() == [row('ann'), row('bob'), row('cat')]
+    if output_format == 'parquet':
+        import pyarrow.parquet
+        assert pyarrow.parquet.ParquetFile(path).metadata.num_row_groups == 2
+
+
+@pytest.mark.parametrize('output_format', ['parquet', 'arrow'])
+def test_columnar_resume_keeps_the_rows(tmp_path, output_format):
+    pytest.importorskip('pyarrow')
+    path = str(tmp_path / f'results.{output_format}')
+    with writers.open_writer(path) as writer:
+        writer.write(row('ann'))
+    # A run that dies before closing leaves the previous file as it was
+    writer = writers.open_writer(path, resume=True)
+    writer.write(row('bob'))
+    writer._write_pending()
+    assert read_table(path, output_format).to_pylist() == [row('ann')]
+    writer._close()
+    with writers.open_writer(path, resume=True) as writer:
+        assert writer.done == {'ann.pdf'}
+        writer.write(row('bob'))
+    assert read_table(path, output_format).to_pylist() == [row('ann'), row('bob')]
+
+
+def test_columnar_compression_is_checked(tmp_path):
+    pytest.importorskip('pyarrow')
+    with pytest.raises(ValueError, match='brotli'):
+        writers.open_writer(str(tmp_path / 'results.arrow'), compression='brotli')
+    with pytest.raises(ValueError):
+        writers.open_writer('-', 'parquet')
@@ -0,0 +1,309 @@
+"""
+Streaming result writers.
+
+Rows are written as soon as each CV is parsed and flushed regularly, so a
+crash part-way through a batch keeps everything finished so far. In resume
+mode an existing output file is appended to, and the filenames already in it
+are available as `done` so callers can skip them.
+
+Parquet and Arrow IPC output (which need pyarrow) are columnar: rows are
+collected column by column and written in row groups, and the file only
+appears, complete, when the writer is closed.
+"""
+
+import csv
+import json
+import os
+import sys
+
+import engine
+
+FORMATS = ('csv', 'jsonl', 'parquet', 'arrow')
+# Compression codecs pyarrow accepts for each columnar format
+COMPRESSIONS = {
+    'parquet': ('none', 'snappy', 'gzip', 'brotli', 'lz4', 'zstd'),
+    'arrow': ('none', 'lz4', 'zstd'),
+}
+DEFAULT_ROW_GROUP_SIZE = 10000
+
+
+def format_for_path(path):
+    if path.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    if path.endswith('.parquet'):
+        return 'parquet'
+    if path.endswith(('.arrow', '.feather', '.ipc')):
+        return 'arrow'
+    return 'csv'
+
+
+def _truncate_partial_line(path):
+    # A crash can leave half a row at the end of the file; drop it.
+    with open(path, 'rb+') as file:
+        file.seek(0, os.SEEK_END)
+        size = file.tell()
+        if size == 0:
+            return
+        file.seek(max(0, size - 65536))
+        tail = file.read()
+        if tail.endswith(b'\n'):
+            return
+        newline = tail.rfind(b'\n')
+        if newline == -1 and size > len(tail):
+            return
+        file.truncate(size - len(tail) + newline + 1)
+
+
+class ResultWriter:
+    def __init__(self, path, resume=False, flush_every=20, fieldnames=engine.FIELDNAMES):
+        self.path = path
+        self.fieldnames = fieldnames
+        self.flush_every = flush_every
+        self.done = set()
+        self.rows_written = 0
+        append = False
+        if path == '-':
+            if resume:
+                raise ValueError("cannot resume when writing to stdout")
+            self.file = sys.stdout
+        else:
+            if resume and os.path.exists(path):
+                _truncate_partial_line(path)
+                if os.path.getsize(path) > 0:
+                    self.done = self._read_done()
+                    append = True
+            self.file = open(path, 'a' if append else 'w', newline='', encoding='utf-8')
+        self.resumed = append
+        self._start(append)
+
+    def _start(self, append):
+        pass
+
+    def _read_done(self):
+        raise NotImplementedError
+
+    def _check_columns(self, columns):
+        if list(columns) != list(self.fieldnames):
+            raise ValueError(f"{self.path} has the columns {', '.join(columns)}, "
+                             f"not {', '.join(self.fieldnames)}; write to a new file instead")
+
+    def previous_rows(self):
+        """
+        Iterate over the rows that were already in the file when it was
+        opened to resume, as dicts. They are read back from disk, so call
+        this before writing anything.
+        """
+        if not self.resumed:
+            return []
+        return self._read_rows()
+
+    def _read_rows(self):
+        raise NotImplementedError
+
+    def _write_row(self, row):
+        raise NotImplementedError
+
+    def write(self, info):
+        self._write_row(info)
+        self.done.add(info['Filename'])
+        self.rows_written += 1
+        if self.rows_written % self.flush_every == 0:
+            self.flush()
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        if self.file is sys.stdout:
+            self.file.flush()
+        else:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class CsvResultWriter(ResultWriter):
+    def _start(self, append):
+        self.writer = csv.DictWriter(self.file, fieldnames=self.fieldnames, extrasaction='ignore')
+        if not append:
+            self.writer.writeheader()
+
+    def _read_done(self):
+        with open(self.path, newline='', encoding='utf-8') as file:
+            reader = csv.DictReader(file)
+            self._check_columns(reader.fieldnames or [])
+            return {row['Filename'] for row in reader if row.get('Filename')}
+
+    def _read_rows(self):
+        with open(self.path, newline='', encoding='utf-8') as file:
+            yield from csv.DictReader(file)
+
+    def _write_row(self, row):
+        self.writer.writerow(row)
+
+
+class JsonlResultWriter(ResultWriter):
+    def _read_done(self):
+        done = set()
+        for number, row in enumerate(self._read_rows()):
+            if number == 0:
+                self._check_columns(row)
+            done.add(row.get('Filename'))
+        done.discard(None)
+        return done
+
+    def _read_rows(self):
+        with open(self.path, encoding='utf-8') as file:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+    def _write_row(self, row):
+        self.file.write(json.dumps({key: row.get(key, '') for key in self.fieldnames}) + '\n')
+
+
+class ColumnarResultWriter(ResultWriter):
+    """
+    Base for the pyarrow formats. Rows are kept as one list per column and
+    written out every row_group_size rows. Everything goes to a temporary
+    file that replaces path on close, so if the process dies first any
+    previous output is left untouched. Resuming rewrites the existing rows
+    first.
+    """
+
+    output_format = None
+
+    def __init__(self, path, resume=False, flush_every=20, fieldnames=engine.FIELDNAMES,
+                 row_group_size=DEFAULT_ROW_GROUP_SIZE, compression=None):
+        import pyarrow
+        if path == '-':
+            raise ValueError(f"{self.output_format} output cannot be written to stdout")
+        if compression is not None and compression not in COMPRESSIONS[self.output_format]:
+            raise ValueError(f"{self.output_format} does not support {compression!r} compression, "
+                             f"choose from: {', '.join(COMPRESSIONS[self.output_format])}")
+        self.path = path
+        self.fieldnames = fieldnames
+        self.flush_every = flush_every
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.rows_written = 0
+        self.done = set()
+        self.schema = pyarrow.schema([(field, pyarrow.string()) for field in fieldnames])
+        self._columns = {field: [] for field in fieldnames}
+        self._pending = 0
+        previous = self._read_table(path) if resume and os.path.exists(path) else None
+        if previous is not None:
+            self._check_columns(previous.column_names)
+        self.resumed = previous is not None
+        self.temp_path = path + '.tmp'
+        self._open(self.temp_path)
+        if previous is not None:
+            self.done = {name for name in previous.column('Filename').to_pylist() if name}
+            self._write_table(previous.cast(self.schema))
+
+    def _open(self, temp_path):
+        raise NotImplementedError
+
+    def _read_table(self, path):
+        raise NotImplementedError
+
+    def _write_table(self, table):
+        raise NotImplementedError
+
+    def _read_rows(self):
+        # The file at path is only replaced on close
+        return self._read_table(self.path).to_pylist()
+
+    def _write_row(self, row):
+        for field in self.fieldnames:
+            self._columns[field].append(row.get(field, ''))
+        self._pending += 1
+        if self._pending >= self.row_group_size:
+            self._write_pending()
+
+    def _write_pending(self):
+        if not self._pending:
+            return
+        import pyarrow
+        self._write_table(pyarrow.table(self._columns, schema=self.schema))
+        self._columns = {field: [] for field in self.fieldnames}
+        self._pending = 0
+
+    def flush(self):
+        # Nothing can be read back before close, so keep row groups full size
+        pass
+
+    def close(self):
+        self._write_pending()
+        self._close()
+        os.replace(self.temp_path, self.path)
+
+    def _close(self):
+        raise NotImplementedError
+
+
+class ParquetResultWriter(ColumnarResultWriter):
+    output_format = 'parquet'
+
+    def _open(self, temp_path):
+        import pyarrow.parquet
+        self.writer = pyarrow.parquet.ParquetWriter(temp_path, self.schema,
+                                                    compression=self.compression or 'snappy')
+
+    def _read_table(self, path):
+        import pyarrow.parquet
+        return pyarrow.parquet.read_table(path)
+
+    def _write_table(self, table):
+        self.writer.write_table(table, row_group_size=self.row_group_size)
+
+    def _close(self):
+        self.writer.close()
+
+
+class ArrowResultWriter(ColumnarResultWriter):
+    output_format = 'arrow'
+
+    def _open(self, temp_path):
+        import pyarrow
+        compression = None if self.compression in (None, 'none') else self.compression
+        self.writer = pyarrow.ipc.new_file(temp_path, self.schema,
+                                           options=pyarrow.ipc.IpcWriteOptions(compression=compression))
+
+    def _read_table(self, path):
+        import pyarrow
+        with pyarrow.memory_map(path) as source:
+            return pyarrow.ipc.open_file(source).read_all()
+
+    def _write_table(self, table):
+        self.writer.write_table(table, max_chunksize=self.row_group_size)
+
+    def _close(self):
+        self.writer.close()
+
+
+WRITERS = {
+    'csv': CsvResultWriter,
+    'jsonl': JsonlResultWriter,
+    'parquet': ParquetResultWriter,
+    'arrow': ArrowResultWriter,
+}
+
+
+def open_writer(path, output_format=None, resume=False, flush_every=20, row_group_size=None,
+                compression=None, fieldnames=engine.FIELDNAMES):
+    """
+    row_group_size and compression only apply to the columnar formats
+    (parquet, arrow), see COMPRESSIONS.
+    """
+    if output_format is None:
+        output_format = format_for_path(path)
+    writer_class = WRITERS[output_format]
+    if issubclass(writer_class, ColumnarResultWriter):
+        return writer_class(path, resume=resume, flush_every=flush_every, fieldnames=fieldnames,
+                            row_group_size=row_group_size or DEFAULT_ROW_GROUP_SIZE, compression=compression)
+    return writer_class(path, resume=resume, flush_every=flush_every, fieldnames=fieldnames)